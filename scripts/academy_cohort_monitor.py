@@ -0,0 +1,269 @@
+"""
+scripts/academy_cohort_monitor.py
+Cohort-wide Academy Development Monitor.
+
+Generalises the single-player monitor in the GW26 notebook (TARGET_ID = 226)
+to a whole cohort -- all U23s, a loanee list, any set of FPL ids -- in one
+pass over the stored GW*_playermatchstats.csv files:
+
+  * per-90 KPI matrix  (players x appearances, one slot per qualifying match,
+    packed left so rotation / loan gaps and double gameweeks need no special case)
+  * Z-score vs the per-GW league baseline (players with >= MIN_MATCH_MINUTES)
+  * rolling Z + trend slope over the last WINDOW appearances -- batched least
+    squares for every player and appearance at once (prefix sums, no per-player loop)
+  * change-point detection -- best single mean-shift split per player, scored
+    with prefix sums over all candidate splits simultaneously; flags breakouts
+    and regressions
+  * first breakout GW (rolling Z >= BREAKOUT), as in the notebook
+
+Outputs:
+  assets/academy_cohort_monitor.png  -- trajectories of the flagged players
+"""
+import os, re, glob, argparse, warnings
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+warnings.filterwarnings('ignore')
+
+BASE       = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+GW_GLOB    = os.path.join(BASE, 'FPL_RAW_DATA', 'main_2025', 'GW*_playermatchstats.csv')
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets')
+
+KPIS              = ['chances_created']   # any count column in the GW files
+MIN_MATCH_MINUTES = 45
+WINDOW            = 5      # appearances per rolling window
+MIN_POINTS        = 3      # appearances needed before a rolling value (min_periods)
+BREAKOUT          = 0.75   # rolling Z threshold (σ)
+CHANGE_STAT       = 3.0    # change-point statistic threshold (max over splits)
+MIN_SEGMENT       = 3      # appearances required either side of a change-point
+
+
+# ── Load ──────────────────────────────────────────────────────────────────────
+def load_gameweeks(gw_glob=GW_GLOB, kpis=KPIS):
+    """Concatenate every GW file once; returns long frame gw/player_id/minutes/kpis."""
+    frames = []
+    for fp in sorted(glob.glob(gw_glob)):
+        m = re.search(r'GW(\d+)_', os.path.basename(fp))
+        if not m:
+            continue
+        cols = ['player_id', 'minutes_played'] + kpis
+        df = pd.read_csv(fp, usecols=lambda c: c in cols)
+        if not set(cols) <= set(df.columns):
+            continue
+        df['gw'] = int(m.group(1))
+        frames.append(df)
+    if not frames:
+        raise FileNotFoundError(f"No GW player stat files found: {gw_glob}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def u23_ids(players, season_start='2025-08-01', dob_col='birth_date', id_col='player_id'):
+    """Ids of players aged under 23 at season start (needs a date-of-birth column)."""
+    dob = pd.to_datetime(players[dob_col], errors='coerce')
+    age = (pd.Timestamp(season_start) - dob).dt.days / 365.25
+    return players.loc[age < 23, id_col].tolist()
+
+
+# ── Matrices ──────────────────────────────────────────────────────────────────
+def kpi_matrices(long_df, kpi, cohort_ids=None):
+    """Appearance matrices (players x appearance slots) for the cohort.
+
+    One slot per qualifying match row, in GW order and packed left (NaN after a
+    player's last appearance), so double gameweeks keep both matches and
+    rotated or loaned players have no gaps between appearances. Each
+    appearance is scored against its own GW league baseline, as in the notebook.
+    Returns (player_ids, {'gw', 'p90', 'z', 'gw_mean', 'gw_std'}).
+    """
+    played = long_df[long_df['minutes_played'] >= MIN_MATCH_MINUTES].copy()
+    played['p90'] = played[kpi] / played['minutes_played'] * 90
+
+    base = played.groupby('gw')['p90'].agg(['mean', 'std'])
+    base['std'] = base['std'].replace(0, np.nan).fillna(1e-6)
+
+    if cohort_ids is not None:
+        played = played[played['player_id'].isin(cohort_ids)]
+    played = played.dropna(subset=['p90']).sort_values(['player_id', 'gw'], kind='stable')
+    played['gw_mean'] = base['mean'].reindex(played['gw']).values
+    played['gw_std']  = base['std'].reindex(played['gw']).values
+    played['z'] = (played['p90'] - played['gw_mean']) / played['gw_std']
+
+    codes, ids = pd.factorize(played['player_id'], sort=True)
+    slot = played.groupby('player_id').cumcount().values
+    shape = (len(ids), int(slot.max()) + 1 if len(slot) else 0)
+    mats = {}
+    for col in ['gw', 'p90', 'z', 'gw_mean', 'gw_std']:
+        m = np.full(shape, np.nan)
+        m[codes, slot] = played[col].to_numpy(dtype=float)
+        mats[col] = m
+    return np.asarray(ids), mats
+
+
+def _window_sums(a, window):
+    """Trailing-window sums along axis 1 (NaN treated as 0), same shape as a."""
+    cs = np.cumsum(np.nan_to_num(a), axis=1)
+    out = cs.copy()
+    out[:, window:] = cs[:, window:] - cs[:, :-window]
+    return out
+
+
+def rolling_trend(z, gw, window=WINDOW, min_points=MIN_POINTS):
+    """Batched OLS slope (per GW) + mean of z over each player's last `window`
+    appearances -- the notebook's rolling(WINDOW, min_periods=MIN_POINTS)."""
+    mask = ~np.isnan(z)
+    x  = np.where(mask, gw, 0.0)
+    y  = np.where(mask, z, 0.0)
+    n   = _window_sums(mask.astype(float), window)
+    sx  = _window_sums(x, window)
+    sy  = _window_sums(y, window)
+    sxx = _window_sums(x * x, window)
+    sxy = _window_sums(x * y, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denom = n * sxx - sx ** 2
+        ok    = mask & (n >= min_points)
+        slope = np.where(ok & (denom > 0), (n * sxy - sx * sy) / denom, np.nan)
+        mean  = np.where(ok, sy / n, np.nan)
+    return slope, mean
+
+
+def change_points(z, gw, min_segment=MIN_SEGMENT):
+    """Best single mean-shift split per player's appearance sequence, all
+    candidate splits at once.
+
+    Statistic = |mean_after - mean_before| * sqrt(n1 * n2 / n) on the Z scale,
+    i.e. the shift in cohort σ scaled by its standard error under unit variance.
+    Returns (change_gw, shift, stat) arrays, NaN where no valid split exists
+    (all NaN for an empty cohort or a single appearance slot).
+    """
+    if len(z) == 0 or z.shape[1] < 2:
+        nan = np.full(len(z), np.nan)
+        return nan, nan.copy(), nan.copy()
+    mask = ~np.isnan(z)
+    y    = np.where(mask, z, 0.0)
+    c_n  = np.cumsum(mask, axis=1).astype(float)
+    c_y  = np.cumsum(y, axis=1)
+    tot_n, tot_y = c_n[:, -1:], c_y[:, -1:]
+
+    n1, s1 = c_n[:, :-1], c_y[:, :-1]              # split after column k
+    n2, s2 = tot_n - n1, tot_y - s1
+    valid  = (n1 >= min_segment) & (n2 >= min_segment) & mask[:, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = s2 / n2 - s1 / n1
+        stat  = np.abs(shift) * np.sqrt(n1 * n2 / (n1 + n2))
+    stat = np.where(valid, stat, -np.inf)
+
+    best = np.argmax(stat, axis=1)
+    rows = np.arange(len(z))
+    best_stat = stat[rows, best]
+    ok = np.isfinite(best_stat)
+    change_gw = np.where(ok, gw[rows, best + 1], np.nan)   # first GW of the new regime
+    return change_gw, np.where(ok, shift[rows, best], np.nan), np.where(ok, best_stat, np.nan)
+
+
+# ── Monitor ───────────────────────────────────────────────────────────────────
+def monitor_cohort(long_df, cohort_ids=None, kpi=KPIS[0], window=WINDOW):
+    """One-pass cohort monitor; returns (summary, trajectories) DataFrames."""
+    ids, m = kpi_matrices(long_df, kpi, cohort_ids)
+    Z, GW = m['z'], m['gw']
+    mask = ~np.isnan(Z)
+    rows = np.arange(len(Z))
+
+    slope, roll_z = rolling_trend(Z, GW, window)
+    chg_gw, shift, stat = change_points(Z, GW)
+
+    hit = roll_z >= BREAKOUT
+    first_idx = np.argmax(hit, axis=1) if hit.size else np.zeros(len(Z), dtype=int)
+    first_breakout = np.where(hit.any(axis=1), GW[rows, first_idx], np.nan)
+
+    # latest defined rolling values per player
+    has = ~np.isnan(roll_z)
+    last_idx = (Z.shape[1] - 1 - np.argmax(has[:, ::-1], axis=1) if has.size
+                else np.zeros(len(Z), dtype=int))
+    latest_slope = np.where(has.any(axis=1), slope[rows, last_idx], np.nan)
+    latest_z     = np.where(has.any(axis=1), roll_z[rows, last_idx], np.nan)
+
+    flag = np.where(stat >= CHANGE_STAT, np.where(shift > 0, 'breakout', 'regression'), '')
+    summary = pd.DataFrame({
+        'player_id':          ids,
+        'apps':               mask.sum(axis=1),
+        f'{kpi}_per90':       np.nanmean(m['p90'], axis=1),
+        'mean_z':             np.nanmean(Z, axis=1),
+        'rolling_z':          latest_z,
+        'trend_slope':        latest_slope,
+        'first_breakout_gw':  first_breakout,
+        'change_gw':          chg_gw,
+        'change_shift_z':     shift,
+        'change_stat':        stat,
+        'flag':               flag,
+    })
+
+    A = Z.shape[1]
+    traj = pd.DataFrame({
+        'player_id':   np.repeat(ids, A),
+        'appearance':  np.tile(np.arange(1, A + 1), len(ids)),
+        'gw':          GW.ravel(),
+        f'{kpi}_per90': m['p90'].ravel(),
+        'z_score':     Z.ravel(),
+        'rolling_z':   roll_z.ravel(),
+        'trend_slope': slope.ravel(),
+        'gw_mean':     m['gw_mean'].ravel(),
+        'gw_std':      m['gw_std'].ravel(),
+    }).dropna(subset=['z_score'])
+    traj['gw'] = traj['gw'].astype(int)
+    return summary, traj
+
+
+def plot_flagged(summary, traj, kpi=KPIS[0], names=None, max_players=12,
+                 out_path=os.path.join(ASSETS_DIR, 'academy_cohort_monitor.png')):
+    """Small-multiple rolling-Z trajectories for the strongest change-points."""
+    flagged = summary[summary['flag'] != ''].nlargest(max_players, 'change_stat')
+    if flagged.empty:
+        print("No breakouts or regressions flagged.")
+        return None
+    ncols = min(4, len(flagged))
+    nrows = int(np.ceil(len(flagged) / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(4 * ncols, 3 * nrows),
+                             squeeze=False, facecolor='#0d0d0d')
+    for ax, (_, r) in zip(axes.ravel(), flagged.iterrows()):
+        t = traj[traj['player_id'] == r['player_id']]
+        colour = '#00BCD4' if r['flag'] == 'breakout' else '#FF4444'
+        ax.set_facecolor('#111111')
+        ax.plot(t['gw'], t['z_score'], 'o', color=colour, ms=3, alpha=0.5)
+        ax.plot(t['gw'], t['rolling_z'], '-', color=colour, lw=2)
+        ax.axvline(r['change_gw'], color='white', ls=':', lw=1)
+        ax.axhline(BREAKOUT, color='gray', ls='--', lw=0.8)
+        label = names.get(r['player_id'], r['player_id']) if names else r['player_id']
+        ax.set_title(f"{label}  ·  {r['flag']} GW{int(r['change_gw'])} "
+                     f"({r['change_shift_z']:+.2f}σ)", color='white', fontsize=8)
+        ax.tick_params(colors='#cccccc', labelsize=7)
+    for ax in axes.ravel()[len(flagged):]:
+        ax.axis('off')
+    fig.suptitle(f'Academy Cohort Monitor  |  {kpi} per 90  |  rolling Z vs GW cohort  |  '
+                 f'{len(summary)} players', color='white', fontweight='bold')
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fig.savefig(out_path, dpi=140, bbox_inches='tight', facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return out_path
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Cohort development monitor')
+    ap.add_argument('--gw-glob', default=GW_GLOB)
+    ap.add_argument('--ids', type=int, nargs='*', help='cohort player ids (default: all)')
+    ap.add_argument('--kpi', default=KPIS[0])
+    args = ap.parse_args()
+
+    long_df = load_gameweeks(args.gw_glob, [args.kpi])
+    summary, traj = monitor_cohort(long_df, args.ids, args.kpi)
+    if traj.empty:
+        raise SystemExit(f"Empty cohort: no appearances of {MIN_MATCH_MINUTES}+ minutes"
+                         + (f" for ids {args.ids}" if args.ids else ""))
+    print(f"Cohort: {len(summary)} players | GW{int(traj['gw'].min())}–GW{int(traj['gw'].max())}")
+    print(summary[summary['flag'] != '']
+          .sort_values('change_stat', ascending=False)
+          .to_string(index=False, float_format='%.2f'))
+    out = plot_flagged(summary, traj, args.kpi)
+    if out:
+        print(f"\nSaved: {out}")
@@ -0,0 +1,335 @@
+"""
+scripts/build_assets.py
+Dependency-tracked incremental rebuild of assets/ (scripts + notebooks).
+
+Every chart producer is a target with declared inputs:
+  inputs  -- data files / globs it reads
+  code    -- source files that define it (defaults to the runner itself)
+  deps    -- other targets that must be built first
+  outputs -- files (or globs) it writes
+
+A target's key is the SHA-256 of its input hashes, code hashes and its
+dependencies' keys. Only targets whose key changed (or whose outputs are
+missing) are re-run; independent stale targets run in parallel. File hashes
+are cached by (mtime, size), so unchanged data is never re-read. A run only
+counts as built if every declared output was (re)written during it.
+
+Granularity is one target per producing script / notebook -- the existing
+runners write several charts per execution and are not split per chart.
+
+State lives in .build_cache.json at the repo root; executed notebooks are
+written to .build/ so the source .ipynb files (and their hashes) are untouched.
+
+Usage:
+  python scripts/build_assets.py                 # rebuild whatever is stale
+  python scripts/build_assets.py --dry-run       # show plan + changed inputs
+  python scripts/build_assets.py gw26_autopsy -j 4 --force
+"""
+import os, sys, glob, json, hashlib, argparse, subprocess, threading, time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+REPO     = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BASE     = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+FPL_DIR  = os.path.join(BASE, 'FPL_RAW_DATA', 'main_2025')
+DATA_DIR = os.path.join(BASE, '03_DATA__Match_Features_Predictions')
+
+CACHE_FILE = os.path.join(REPO, '.build_cache.json')
+BUILD_DIR  = os.path.join(REPO, '.build')
+MTIME_SLACK = 1.0   # seconds; tolerates coarse filesystem timestamps
+
+# ── Target graph ──────────────────────────────────────────────────────────────
+# Relative paths are relative to the repo root.
+TARGETS = {
+    'forward_validation': {
+        'notebook': 'forward_validation_demo.ipynb',
+        'inputs':   ['sample_dataset.csv'],
+        'outputs':  ['assets/forward_validation_split.png', 'assets/drift_monitoring.png',
+                     'assets/feature_importance.png'],
+    },
+    'calibration': {
+        'notebook': 'calibration_analysis.ipynb',
+        'inputs':   ['sample_dataset.csv'],
+        'outputs':  ['assets/calibration_curve.png', 'assets/decile_reliability.png'],
+    },
+    'gw26_autopsy': {
+        'notebook': 'gw26_gamestate_and_variance_autopsy.ipynb',
+        'inputs':   [os.path.join(DATA_DIR, 'GW26_PREDICTION_MARKET_COMPARISON.csv'),
+                     os.path.join(DATA_DIR, 'MASTER__Intermediate_Features.csv'),
+                     os.path.join(FPL_DIR, 'GW*_playermatchstats.csv')],
+        'outputs':  ['assets/gw26_goal_expectancy.png', 'assets/gw26_territorial_dominance.png',
+                     'assets/gw26_volatility_heatmap.png', 'assets/gw26_everton_finishing_variance.png',
+                     'assets/gw26_academy_development_monitor.png'],
+    },
+    'garner_radar': {
+        'script':   'scripts/player_radar_profile.py',
+        'inputs':   [os.path.join(FPL_DIR, 'GW*_player_gameweek_stats.csv'),
+                     os.path.join(FPL_DIR, 'GW22_players.csv')],
+        'code':     ['scripts/player_radar_profile.py', 'scripts/percentile_bootstrap.py'],
+        'outputs':  ['assets/garner_performance_radar.png',
+                     'assets/garner_radar_percentile_intervals.csv'],
+    },
+    'garner_form_arc': {
+        'script':   'scripts/player_form_arc.py',
+        'inputs':   [os.path.join(FPL_DIR, 'GW*_player_gameweek_stats.csv')],
+        'outputs':  ['assets/garner_cm_comparison.png', 'assets/garner_rolling_arc.png'],
+    },
+    'everton_radars': {
+        'script':   'scripts/everton_squad_radar.py',
+        'inputs':   [os.path.join(FPL_DIR, 'GW*_player_gameweek_stats.csv'),
+                     os.path.join(BASE, 'FPL_PLAYERS_2025_2026.csv')],
+        'code':     ['scripts/everton_squad_radar.py', 'scripts/percentile_bootstrap.py'],
+        'outputs':  ['assets/everton_player_radars.png', 'assets/everton_player_radar_*.png',
+                     'assets/player_percentile_intervals.csv'],
+    },
+    'academy_cohort_monitor': {
+        'script':   'scripts/academy_cohort_monitor.py',
+        'inputs':   [os.path.join(FPL_DIR, 'GW*_playermatchstats.csv')],
+        'outputs':  ['assets/academy_cohort_monitor.png'],
+    },
+}
+
+
+def _abs(path):
+    return path if os.path.isabs(path) else os.path.join(REPO, path)
+
+
+def _runner(spec):
+    return spec.get('script') or spec['notebook']
+
+
+# ── Hashing ───────────────────────────────────────────────────────────────────
+class HashCache:
+    """sha256 per file, reused while (mtime_ns, size) are unchanged."""
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        self._lock   = threading.Lock()
+
+    def file(self, path):
+        st = os.stat(path)
+        sig = [st.st_mtime_ns, st.st_size]
+        with self._lock:
+            hit = self.entries.get(path)
+        if hit and hit[:2] == sig:
+            return hit[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.entries[path] = sig + [digest]
+        return digest
+
+    def paths(self, patterns):
+        """{path: sha} for every file matched by the patterns (missing -> None)."""
+        out = {}
+        for pat in patterns:
+            p = _abs(pat)
+            matches = sorted(glob.glob(p)) if glob.has_magic(p) else [p]
+            if not matches:
+                out[p] = None
+            for m in matches:
+                out[m] = self.file(m) if os.path.exists(m) else None
+        return out
+
+
+def topo_order(targets):
+    order, seen, active = [], set(), set()
+
+    def visit(name):
+        if name in seen:
+            return
+        if name in active:
+            raise ValueError(f"Dependency cycle at target {name!r}")
+        if name not in targets:
+            raise ValueError(f"Unknown target {name!r}")
+        active.add(name)
+        for d in targets[name].get('deps', []):
+            visit(d)
+        active.discard(name)
+        seen.add(name)
+        order.append(name)
+
+    for n in targets:
+        visit(n)
+    return order
+
+
+def compute_keys(targets, hashes):
+    """Key + input/code hash maps for every target, in dependency order."""
+    info = {}
+    for name in topo_order(targets):
+        spec = targets[name]
+        inputs = hashes.paths(spec.get('inputs', []))
+        code   = hashes.paths(spec.get('code', [_runner(spec)]))
+        blob = json.dumps({
+            'inputs': inputs,
+            'code':   code,
+            'deps':   {d: info[d]['key'] for d in spec.get('deps', [])},
+        }, sort_keys=True).encode()
+        info[name] = {'key': hashlib.sha256(blob).hexdigest(), 'inputs': {**inputs, **code}}
+    return info
+
+
+def _output_files(pat):
+    p = _abs(pat)
+    return glob.glob(p) if glob.has_magic(p) else [p] if os.path.exists(p) else []
+
+
+def outputs_present(spec):
+    return all(_output_files(pat) for pat in spec.get('outputs', []))
+
+
+def outputs_not_written(spec, since):
+    """Declared outputs with no file modified at or after `since` (epoch seconds).
+
+    Committed assets already exist, so existence alone cannot tell a real run
+    from one that wrote elsewhere (or nothing); a glob needs one fresh match.
+    """
+    cutoff = since - MTIME_SLACK
+    return [pat for pat in spec.get('outputs', [])
+            if not any(os.path.getmtime(f) >= cutoff for f in _output_files(pat))]
+
+
+def stale_reason(name, spec, info, cache):
+    """None if up to date, else a short human-readable reason."""
+    prev = cache.get('targets', {}).get(name)
+    if prev is None:
+        return 'never built'
+    if prev['key'] != info['key']:
+        changed = [os.path.relpath(p, REPO) if p.startswith(REPO) else p
+                   for p, h in info['inputs'].items() if prev.get('inputs', {}).get(p) != h]
+        gone = [p for p in prev.get('inputs', {}) if p not in info['inputs']]
+        if changed or gone:
+            return 'changed: ' + ', '.join((changed + gone)[:5]) + (' …' if len(changed + gone) > 5 else '')
+        return 'dependency changed'
+    if not outputs_present(spec):
+        return 'outputs missing'
+    return None
+
+
+# ── Execution ─────────────────────────────────────────────────────────────────
+def command_for(name, spec):
+    if 'script' in spec:
+        return [sys.executable, _abs(spec['script'])], REPO
+    nb = _abs(spec['notebook'])
+    return ([sys.executable, '-m', 'jupyter', 'nbconvert', '--to', 'notebook', '--execute',
+             '--output-dir', BUILD_DIR, '--output', f'{name}.ipynb', nb],
+            os.path.dirname(nb))
+
+
+def run_target(name, spec):
+    cmd, cwd = command_for(name, spec)
+    started = time.time()
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - t0, started
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'targets': {}, 'hashes': {}}
+
+
+def save_cache(cache):
+    tmp = CACHE_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+
+def build(selected=None, jobs=os.cpu_count(), force=False, dry_run=False, targets=TARGETS):
+    """Rebuild stale targets (and their deps); returns {name: status}."""
+    cache  = load_cache()
+    hashes = HashCache(cache.get('hashes'))
+    wanted = set(targets)
+    if selected:
+        wanted = set().union(*(_closure(targets, s) for s in selected))
+    order = [n for n in topo_order(targets) if n in wanted]
+    info  = compute_keys({n: targets[n] for n in order}, hashes)
+
+    plan = {}
+    for n in order:
+        reason = 'forced' if force else stale_reason(n, targets[n], info[n], cache)
+        plan[n] = reason
+        print(f"  {'REBUILD' if reason else 'ok':<8} {n:<24} {reason or ''}")
+    if dry_run:
+        return plan
+
+    status = {n: 'fresh' for n in order if plan[n] is None}
+    pending = [n for n in order if plan[n] is not None]
+    lock = threading.Lock()
+    os.makedirs(BUILD_DIR, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while pending or running:
+            for n in list(pending):
+                deps = targets[n].get('deps', [])
+                if any(status.get(d) in ('failed', 'skipped') for d in deps):
+                    status[n] = 'skipped'
+                    pending.remove(n)
+                elif all(status.get(d) in ('fresh', 'built') for d in deps):
+                    running[pool.submit(run_target, n, targets[n])] = n
+                    pending.remove(n)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n = running.pop(fut)
+                code, log, secs, started = fut.result()
+                missing = outputs_not_written(targets[n], started) if code == 0 else []
+                if code == 0 and not missing:
+                    status[n] = 'built'
+                    with lock:
+                        cache['targets'][n] = {'key': info[n]['key'], 'inputs': info[n]['inputs'],
+                                               'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                        cache['hashes'] = hashes.entries
+                        save_cache(cache)
+                    print(f"  built    {n:<24} {secs:.1f}s")
+                elif missing:
+                    status[n] = 'failed'
+                    print(f"  FAILED   {n:<24} exit=0 but not written: {', '.join(missing)}")
+                else:
+                    status[n] = 'failed'
+                    tail = '\n'.join(log.strip().splitlines()[-8:])
+                    print(f"  FAILED   {n:<24} exit={code}\n{tail}")
+
+    cache['hashes'] = hashes.entries
+    save_cache(cache)
+    return status
+
+
+def _closure(targets, name):
+    """name plus everything it depends on."""
+    out, stack = set(), [name]
+    while stack:
+        n = stack.pop()
+        if n not in targets:
+            raise ValueError(f"Unknown target {n!r} -- choose from {sorted(targets)}")
+        if n not in out:
+            out.add(n)
+            stack.extend(targets[n].get('deps', []))
+    return out
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Incremental asset rebuild')
+    ap.add_argument('targets', nargs='*', help=f'subset of {sorted(TARGETS)}')
+    ap.add_argument('-j', '--jobs', type=int, default=os.cpu_count())
+    ap.add_argument('--force', action='store_true')
+    ap.add_argument('--dry-run', action='store_true')
+    args = ap.parse_args()
+
+    print(f"Asset build graph: {len(TARGETS)} targets")
+    result = build(args.targets, args.jobs, args.force, args.dry_run)
+    if not args.dry_run:
+        built  = sum(s == 'built' for s in result.values())
+        failed = [n for n, s in result.items() if s in ('failed', 'skipped')]
+        print(f"\nDone. {built} rebuilt, {len(result) - built - len(failed)} up to date"
+              + (f", {len(failed)} failed/skipped: {', '.join(failed)}" if failed else ''))
+        sys.exit(1 if failed else 0)
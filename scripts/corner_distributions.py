@@ -0,0 +1,224 @@
+"""
+scripts/corner_distributions.py
+Negative-binomial corner model -- full corner distributions per fixture.
+
+The GW26 autopsy compares point estimates (Corners_Home / Corners_Away,
+pred_corners_total) with actual HC / AC. This module fits per-team corner
+rates with over-dispersion and prices every fixture as a distribution:
+
+  log μ_home = mu + home_adv + attack[home] + defence[away]
+  log μ_away = mu +            attack[away] + defence[home]
+  corners ~ NegBin(mean μ, size r)      (variance μ + μ²/r; r -> ∞ is Poisson)
+
+attack = corner "pressure for", defence = corners conceded, both as
+log-deviations from the league mean -- the same integer team-indexed layout as
+the goals parameters (team_parameters.TeamRates), so a fit can be
+aligned to the goal model's team order and indexed with the same ids.
+
+Pricing N fixtures returns N x K pmf matrices (home, away, total) in one
+vectorised pass; line and range probabilities are read from cumulative sums.
+"""
+import os, time, argparse
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln, digamma
+from team_parameters import TeamRates
+
+BASE       = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+MASTER_CSV = os.path.join(BASE, '03_DATA__Match_Features_Predictions', 'MASTER__Intermediate_Features.csv')
+
+MAX_CORNERS  = 30          # per-side support 0..MAX_CORNERS (last bin = tail)
+XI           = 0.0019      # time-decay per day (DC-style); 0 = equal weights
+SUM_PENALTY  = 100.0       # soft sum-to-zero constraint on attack / defence
+CORNER_LINES = [7.5, 8.5, 9.5, 10.5, 11.5, 12.5]
+
+
+class CornerParameters(TeamRates):
+    """TeamRates layout for corners plus the NB dispersion r."""
+
+    def __init__(self, teams, attack, defence, mu, home_adv, dispersion):
+        super().__init__(teams, attack, defence, mu, home_adv)
+        self.dispersion = float(dispersion)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['teams'], d['attack'], d['defence'], d['mu'], d['home_adv'], d['dispersion'])
+
+    def to_dict(self):
+        d = super().to_dict()
+        d['dispersion'] = self.dispersion
+        return d
+
+    expected_corners = TeamRates.expected_rates
+
+
+# ── Negative binomial helpers ─────────────────────────────────────────────────
+def nb_logpmf(k, mu, r):
+    """Elementwise NB log pmf (mean mu, size r); broadcasts."""
+    return (gammaln(k + r) - gammaln(r) - gammaln(k + 1)
+            + r * np.log(r / (r + mu)) + k * np.log(mu / (r + mu)))
+
+
+def nb_pmf_matrix(mu, r, max_k=MAX_CORNERS):
+    """(N,) means -> (N, max_k+1) pmf table; tail mass folded into the last bin."""
+    k = np.arange(max_k + 1)
+    pmf = np.exp(nb_logpmf(k[None, :], np.asarray(mu, dtype=float)[:, None], r))
+    pmf[:, -1] += np.clip(1.0 - pmf.sum(axis=1), 0.0, None)
+    return pmf
+
+
+def convolve_rows(a, b):
+    """Row-wise distribution of X + Y for independent X ~ a, Y ~ b (batched FFT)."""
+    n = a.shape[1] + b.shape[1] - 1
+    size = 1 << (n - 1).bit_length()
+    out = np.fft.irfft(np.fft.rfft(a, size, axis=1) * np.fft.rfft(b, size, axis=1), size, axis=1)[:, :n]
+    return np.clip(out, 0.0, None)
+
+
+def time_weights(dates, xi=XI, ref_date=None):
+    """Exponential decay weights by days before ref_date (default: latest match)."""
+    dates = pd.to_datetime(pd.Series(dates))
+    ref   = pd.Timestamp(ref_date) if ref_date is not None else dates.max()
+    return np.exp(-xi * (ref - dates).dt.days.values.astype(float))
+
+
+# ── Fit ───────────────────────────────────────────────────────────────────────
+def fit_corner_model(home, away, hc, ac, weights=None, teams=None):
+    """Weighted NB maximum likelihood for per-team corner rates.
+
+    teams -- optional fixed team order (e.g. goal_params.teams) so corner and
+             goal parameters share integer ids; must cover every team seen.
+    """
+    teams = list(teams) if teams is not None else sorted(set(home) | set(away))
+    index = {t: i for i, t in enumerate(teams)}
+    hi = np.array([index[t] for t in home])
+    ai = np.array([index[t] for t in away])
+    hc = np.asarray(hc, dtype=float)
+    ac = np.asarray(ac, dtype=float)
+    w  = np.ones(len(hc)) if weights is None else np.asarray(weights, dtype=float)
+    T  = len(teams)
+
+    def unpack(theta):
+        return theta[:T], theta[T:2 * T], theta[2 * T], theta[2 * T + 1], np.exp(theta[2 * T + 2])
+
+    def nll(theta):
+        att, dfn, mu, ha, r = unpack(theta)
+        eta_h = mu + ha + att[hi] + dfn[ai]
+        eta_a = mu + att[ai] + dfn[hi]
+        m_h, m_a = np.exp(eta_h), np.exp(eta_a)
+        ll = w * (nb_logpmf(hc, m_h, r) + nb_logpmf(ac, m_a, r))
+
+        # d ll / d eta = r (k - m) / (r + m);  d ll / d log r = r * d ll / d r
+        g_h = w * r * (hc - m_h) / (r + m_h)
+        g_a = w * r * (ac - m_a) / (r + m_a)
+
+        def dlr(k, m):
+            return digamma(k + r) - digamma(r) + np.log(r / (r + m)) + 1 - (r + k) / (r + m)
+
+        g_att = np.bincount(hi, g_h, T) + np.bincount(ai, g_a, T)
+        g_def = np.bincount(ai, g_h, T) + np.bincount(hi, g_a, T)
+        grad = np.concatenate([g_att, g_def, [g_h.sum() + g_a.sum(), g_h.sum(),
+                                             r * np.sum(w * (dlr(hc, m_h) + dlr(ac, m_a)))]])
+
+        pen = SUM_PENALTY * (att.sum() ** 2 + dfn.sum() ** 2)
+        grad[:T]      -= 2 * SUM_PENALTY * att.sum()
+        grad[T:2 * T] -= 2 * SUM_PENALTY * dfn.sum()
+        return -(ll.sum() - pen), -grad
+
+    mean_c = np.average(np.concatenate([hc, ac]), weights=np.concatenate([w, w]))
+    theta0 = np.concatenate([np.zeros(2 * T), [np.log(mean_c), 0.1, np.log(10.0)]])
+    res = minimize(nll, theta0, jac=True, method='L-BFGS-B')
+    att, dfn, mu, ha, r = unpack(res.x)
+    return CornerParameters(teams, att, dfn, mu, ha, r)
+
+
+# ── Pricing ───────────────────────────────────────────────────────────────────
+def price_fixtures(params, home, away, max_k=MAX_CORNERS):
+    """One vectorised pass: dict of (N, K) pmf matrices + expected corners."""
+    hi = params.index(home)
+    ai = params.index(away)
+    mu_h, mu_a = params.expected_corners(hi, ai)
+    pmf_h = nb_pmf_matrix(mu_h, params.dispersion, max_k)
+    pmf_a = nb_pmf_matrix(mu_a, params.dispersion, max_k)
+    return {
+        'mu_home': mu_h,
+        'mu_away': mu_a,
+        'home':    pmf_h,
+        'away':    pmf_a,
+        'total':   convolve_rows(pmf_h, pmf_a),
+    }
+
+
+def line_probs(pmf, lines=CORNER_LINES):
+    """P(X > line) for half-point lines, read from the cumulative sum: (N, L)."""
+    cdf = np.cumsum(pmf, axis=1)
+    idx = np.floor(np.asarray(lines)).astype(int)
+    return 1.0 - cdf[:, np.clip(idx, 0, cdf.shape[1] - 1)]
+
+
+def range_probs(pmf, lo, hi):
+    """P(lo <= X <= hi) per row."""
+    cdf = np.concatenate([np.zeros((len(pmf), 1)), np.cumsum(pmf, axis=1)], axis=1)
+    return cdf[:, min(hi, pmf.shape[1] - 1) + 1] - cdf[:, lo]
+
+
+def home_corner_edge(priced):
+    """P(home corners > away corners) from the joint of the two marginals."""
+    h, a = priced['home'], priced['away']
+    cdf_a = np.cumsum(a, axis=1)
+    # P(A < k) for each k = cdf_a[k-1]
+    below = np.concatenate([np.zeros((len(a), 1)), cdf_a[:, :-1]], axis=1)
+    return np.sum(h * below, axis=1)
+
+
+def territorial_index(params):
+    """Team-level Territorial Pressure Index vs an average opponent at a neutral venue."""
+    rate_for     = np.exp(params.mu + params.attack)
+    rate_against = np.exp(params.mu + params.defence)
+    return (pd.DataFrame({
+        'team':              params.teams,
+        'corners_for':       rate_for,
+        'corners_against':   rate_against,
+        'territorial_index': rate_for / (rate_for + rate_against),
+    }).sort_values('territorial_index', ascending=False).reset_index(drop=True))
+
+
+def fixture_table(params, home, away, lines=CORNER_LINES):
+    """Fixture-level frame: expected corners, line probabilities, home-edge probability."""
+    priced = price_fixtures(params, home, away)
+    lp = line_probs(priced['total'], lines)
+    out = pd.DataFrame({
+        'home':              list(home),
+        'away':              list(away),
+        'Corners_Home':      priced['mu_home'],
+        'Corners_Away':      priced['mu_away'],
+        'pred_corners_total': priced['mu_home'] + priced['mu_away'],
+        'p_home_more':       home_corner_edge(priced),
+    })
+    for j, line in enumerate(lines):
+        out[f'over_{line}'] = lp[:, j]
+    return out
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Fit + price NB corner distributions')
+    ap.add_argument('--data', default=MASTER_CSV)
+    args = ap.parse_args()
+
+    master = pd.read_csv(args.data, low_memory=False)
+    master['date'] = pd.to_datetime(master['date'])
+    hist = master.dropna(subset=['HC', 'AC']).sort_values('date')
+
+    t0 = time.perf_counter()
+    params = fit_corner_model(hist['home'], hist['away'], hist['HC'], hist['AC'],
+                              weights=time_weights(hist['date']))
+    t1 = time.perf_counter()
+    table = fixture_table(params, hist['home'], hist['away'])
+    t2 = time.perf_counter()
+
+    print(f"Fitted {len(hist)} matches, {len(params.teams)} teams in {t1 - t0:.2f}s "
+          f"(dispersion r = {params.dispersion:.1f}, home adv = {params.home_adv:+.3f})")
+    print(f"Priced {len(table)} fixtures in {t2 - t1:.3f}s")
+    print("\nTerritorial Pressure Index (neutral venue, average opponent):")
+    print(territorial_index(params).to_string(index=False, float_format='%.3f'))
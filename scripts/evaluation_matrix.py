@@ -0,0 +1,222 @@
+"""
+scripts/evaluation_matrix.py
+Multi-model evaluation matrix scored in a single vectorised pass.
+
+forward_validation_demo.ipynb and calibration_analysis.ipynb score one model
+(prob_H) against one naive baseline with separate sklearn calls. Here every
+candidate -- DC-only, boosted-only, blends, draw-multiplier settings, market --
+is stacked into one (M models x N matches x 3 outcomes) array and scored at once:
+
+  brier     multiclass Brier  (sum over H/D/A, mean over matches)
+  brier_H   binary home-win Brier (same quantity the notebooks report)
+  log_loss  -log p(actual outcome)
+  rps       ranked probability score over the ordered outcomes H < D < A
+  accuracy  argmax == actual
+  bss       1 - brier / brier(reference model)
+
+Per-match loss arrays (M, N) are computed once; breakdowns by season, team,
+gameweek or probability band are bincount reductions over precomputed group
+codes, so the cost of an extra model is one more row in every array.
+"""
+import os, argparse
+import numpy as np
+import pandas as pd
+
+OUTCOMES  = ['H', 'D', 'A']
+CLASS_MAP = {o: i for i, o in enumerate(OUTCOMES)}
+EPS       = 1e-15
+METRICS   = ['brier', 'brier_H', 'log_loss', 'rps', 'accuracy']
+PROB_BANDS = [0.0, 0.35, 0.45, 0.55, 0.65, 1.0]   # bands on the model's top probability
+
+
+# ── Building the probability stack ───────────────────────────────────────────
+def stack_models(df, spec):
+    """spec: {name: (col_H, col_D, col_A)} -> (names, (M, N, 3) array)."""
+    names = list(spec)
+    probs = np.stack([df[list(spec[n])].to_numpy(dtype=float) for n in names])
+    return names, probs / probs.sum(axis=2, keepdims=True)
+
+
+def climatology(y_train, n):
+    """Naive baseline: historical outcome frequencies for every match."""
+    freq = np.bincount(y_train, minlength=3) / len(y_train)
+    return np.tile(freq, (n, 1))
+
+
+def draw_multiplier_variants(probs, multipliers):
+    """(N, 3) base probs -> (K, N, 3) with P(D) scaled by each multiplier and renormalised."""
+    out = np.repeat(probs[None], len(multipliers), axis=0)
+    out[:, :, 1] *= np.asarray(multipliers, dtype=float)[:, None]
+    return out / out.sum(axis=2, keepdims=True)
+
+
+# ── Per-match losses ──────────────────────────────────────────────────────────
+def per_match_losses(probs, y, valid=None):
+    """(M, N, 3) probs + (N,) outcome codes -> {metric: (M, N) array}.
+
+    Entries where `valid` is False (e.g. no market price) are 0, never NaN.
+    """
+    if valid is None:
+        valid = np.isfinite(probs).all(axis=2)
+    probs  = np.where(valid[..., None], probs, 1.0 / 3)
+    onehot = np.eye(3)[y][None]                         # (1, N, 3)
+    p_true = np.take_along_axis(probs, y[None, :, None], axis=2)[..., 0]
+    cum_gap = np.cumsum(probs - onehot, axis=2)[..., :-1]
+    losses = {
+        'brier':    np.sum((probs - onehot) ** 2, axis=2),
+        'brier_H':  (probs[..., 0] - onehot[..., 0]) ** 2,
+        'log_loss': -np.log(np.clip(p_true, EPS, 1.0)),
+        'rps':      np.sum(cum_gap ** 2, axis=2) / 2.0,
+        'accuracy': (probs.argmax(axis=2) == y[None]).astype(float),
+    }
+    return {k: np.where(valid, v, 0.0) for k, v in losses.items()}
+
+
+def group_codes(keys):
+    """Factorise a key array once; returns (codes, labels)."""
+    codes, labels = pd.factorize(pd.Series(keys), sort=True)
+    return codes, np.asarray(labels)
+
+
+def _group_sums(values, codes, n_groups):
+    """(M, N) values reduced by codes -- (N,) shared or (M, N) per model -> (M, G)."""
+    M = values.shape[0]
+    codes = np.broadcast_to(codes, values.shape)
+    flat = (np.arange(M)[:, None] * n_groups + codes).ravel()
+    keep = codes.ravel() >= 0
+    return np.bincount(flat[keep], weights=values.ravel()[keep],
+                       minlength=M * n_groups).reshape(M, n_groups)
+
+
+# ── Evaluation ────────────────────────────────────────────────────────────────
+class EvaluationMatrix:
+    """Scores M models on N matches once; summaries and breakdowns reuse the losses.
+
+    A model row with any non-finite probability for a match (e.g. a market
+    model with no odds) skips that match: it is left out of the model's sums
+    and `n`, and BSS compares model and reference on matches both priced.
+    """
+
+    def __init__(self, names, probs, y, reference=None):
+        self.names  = list(names)
+        self.probs  = np.asarray(probs, dtype=float)
+        self.y      = np.asarray(y, dtype=int)
+        if self.probs.shape != (len(self.names), len(self.y), 3):
+            raise ValueError(f"probs shape {self.probs.shape} != "
+                             f"({len(self.names)}, {len(self.y)}, 3)")
+        self.reference = reference
+        self.valid  = np.isfinite(self.probs).all(axis=2)
+        self.losses = per_match_losses(self.probs, self.y, self.valid)
+
+    def _ref_index(self):
+        if self.reference is None:
+            return None
+        if self.reference not in self.names:
+            raise ValueError(f"Reference model {self.reference!r} not in {self.names}")
+        return self.names.index(self.reference)
+
+    def _paired_brier(self):
+        """(model, reference) Brier per match, zeroed unless both priced it -> BSS inputs."""
+        ref = self._ref_index()
+        if ref is None:
+            return None
+        both = self.valid & self.valid[ref][None, :]
+        return (np.where(both, self.losses['brier'], 0.0),
+                np.where(both, self.losses['brier'][ref][None, :], 0.0))
+
+    def _frame(self, sums, counts, paired=None, labels=None, by=None):
+        M = len(self.names)
+        table = {m: sums[m] / np.where(counts > 0, counts, np.nan) for m in METRICS}
+        if paired is not None:
+            model_b, ref_b = paired
+            table['bss'] = 1.0 - model_b / np.where(ref_b > 0, ref_b, np.nan)
+        if labels is None:
+            out = pd.DataFrame({k: v[:, 0] for k, v in table.items()}, index=self.names)
+            out['n'] = counts[:, 0].astype(int)
+            out.index.name = 'model'
+            return out
+        G = len(labels)
+        out = pd.DataFrame({
+            'model': np.repeat(self.names, G),
+            by:      np.tile(labels, M),
+            'n':     counts.ravel().astype(int),
+            **{k: v.ravel() for k, v in table.items()},
+        })
+        return out[out['n'] > 0].reset_index(drop=True)
+
+    def summary(self):
+        """One row per model, sorted by Brier."""
+        sums   = {m: self.losses[m].sum(axis=1, keepdims=True) for m in METRICS}
+        counts = self.valid.sum(axis=1, keepdims=True).astype(float)
+        paired = self._paired_brier()
+        if paired is not None:
+            paired = tuple(b.sum(axis=1, keepdims=True) for b in paired)
+        return self._frame(sums, counts, paired).sort_values('brier')
+
+    def breakdown(self, codes, labels, by='group'):
+        """Long frame (model x group). codes: (N,), (M, N), or a list of those
+        for multi-membership groupings (e.g. home + away team)."""
+        code_list = codes if isinstance(codes, list) else [codes]
+        G = len(labels)
+        sums   = {m: sum(_group_sums(self.losses[m], c, G) for c in code_list) for m in METRICS}
+        counts = sum(_group_sums(self.valid.astype(float), c, G) for c in code_list)
+        paired = self._paired_brier()
+        if paired is not None:
+            paired = tuple(sum(_group_sums(b, c, G) for c in code_list) for b in paired)
+        return self._frame(sums, counts, paired, labels, by)
+
+    def by_key(self, keys, by):
+        """Breakdown by any per-match key (season, gameweek, ...)."""
+        codes, labels = group_codes(keys)
+        return self.breakdown(codes, labels, by)
+
+    def by_team(self, home, away):
+        """Each match counts once for the home side and once for the away side."""
+        codes, labels = group_codes(np.concatenate([np.asarray(home), np.asarray(away)]))
+        n = len(self.y)
+        return self.breakdown([codes[:n], codes[n:]], labels, 'team')
+
+    def by_probability_band(self, bands=PROB_BANDS):
+        """Bands on each model's own top probability (codes differ per model)."""
+        top = np.where(self.valid, np.nan_to_num(self.probs).max(axis=2), 0.0)
+        codes = np.clip(np.digitize(top, bands[1:-1]), 0, len(bands) - 2)
+        codes = np.where(self.valid, codes, -1)
+        labels = np.array([f'{lo:.2f}-{hi:.2f}' for lo, hi in zip(bands[:-1], bands[1:])])
+        return self.breakdown(codes, labels, 'prob_band')
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Multi-model evaluation matrix')
+    ap.add_argument('--data', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   '..', 'sample_dataset.csv'))
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.data)
+    df['match_date'] = pd.to_datetime(df['match_date'])
+    df = df.sort_values('match_date').reset_index(drop=True)
+    df['y'] = df['actual_result'].map(CLASS_MAP)
+
+    season_boundary = pd.Timestamp('2025-08-01')
+    train = df[df['match_date'] < season_boundary]
+    test  = df[df['match_date'] >= season_boundary].reset_index(drop=True)
+    y     = test['y'].values
+
+    names, model = stack_models(test, {'ensemble': ('prob_H', 'prob_D', 'prob_A')})
+    mults = np.round(np.arange(0.70, 1.45, 0.05), 2)
+    probs = np.concatenate([
+        model,
+        draw_multiplier_variants(model[0], mults),
+        climatology(train['y'].values, len(test))[None],
+        np.full((1, len(test), 3), 1 / 3),
+    ])
+    names = names + [f'ensemble_draw_x{m:.2f}' for m in mults] + ['climatology', 'uniform']
+
+    ev = EvaluationMatrix(names, probs, y, reference='climatology')
+    print(f"{len(names)} models x {len(y)} matches (test season 2025-26)\n")
+    print(ev.summary().to_string(float_format='%.4f'))
+    print("\nBy probability band (ensemble vs climatology):")
+    band = ev.by_probability_band()
+    print(band[band['model'].isin(['ensemble', 'climatology'])].to_string(index=False, float_format='%.4f'))
+    print("\nBy team (ensemble, worst 5 Brier):")
+    team = ev.by_team(test['home_team'], test['away_team'])
+    print(team[team['model'] == 'ensemble'].nlargest(5, 'brier').to_string(index=False, float_format='%.4f'))
@@ -10,6 +10,8 @@ percentile rank vs positional peers across the Premier League.
 Outputs:
   assets/everton_player_radars.png   — grid of all qualifying Everton players
   assets/everton_player_radar_<name>.png — individual high-res per player
+  assets/player_percentile_intervals.csv — bootstrap percentile intervals,
+                                           every qualifying player and axis
 """
 
 import pandas as pd
@@ -23,6 +25,7 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyArrowPatch
 from scipy.stats import percentileofscore
+from percentile_bootstrap import resample_totals, rank_percentiles, percentile_interval, N_BOOT, CI
 
 warnings.filterwarnings('ignore')
 
@@ -35,6 +38,7 @@ os.makedirs(ASSETS_DIR, exist_ok=True)
 
 EVERTON_TEAM_CODE = 11
 MIN_MINUTES       = 600   # minimum season minutes to qualify
+BOOTSTRAP_BANDS   = True  # shade the bootstrap percentile interval on each radar
 
 # ── Radar axis definitions (label: raw_column) ────────────────────────────────
 # We use PER-MATCH values from each GW row (FPL API supplies these as cumulative
@@ -173,6 +177,68 @@ qualified['cs_rate'] = qualified['clean_sheets'] / (qualified['minutes'] / 90.0
 
 everton = qualified[qualified['team_code'] == EVERTON_TEAM_CODE].copy()
 
+# ── Bootstrap percentile intervals ────────────────────────────────────────────
+# Resample every qualifying player's GW appearances N_BOOT times in one batched
+# pass, rebuild the radar axes from the resampled totals and re-rank each
+# replicate against the (fixed) positional peer pool.
+print(f"\nBootstrapping percentiles ({N_BOOT} resamples)…")
+apps = raw[(raw['minutes'] > 0) & raw['id'].isin(qualified['id'])]
+boot_ids, boot_tot = resample_totals(apps, 'id', SUM_COLS, n_boot=N_BOOT)
+boot_row = pd.Series(np.arange(len(boot_ids)), index=boot_ids)
+PER90_RAW = dict(PER90)
+
+
+def boot_axis_values(col):
+    """(n_players, N_BOOT) resampled values of a radar axis (None if not derivable)."""
+    n90 = boot_tot['minutes'] / 90.0
+    n90 = np.where(n90 > 0, n90, np.nan)
+    if col in PER90_RAW:
+        return boot_tot[PER90_RAW[col]] / n90
+    if col == 'discipline_p90':
+        return 1.0 / (boot_tot['yellow_cards'] / n90 + 0.1)
+    if col == 'goals_conceded_p90_inv':
+        return 1.0 / (boot_tot['goals_conceded'] / n90 + 0.1)
+    if col == 'cs_rate':
+        return boot_tot['clean_sheets'] / np.clip(boot_tot['minutes'] / 90.0 / 10, 1, None)
+    return None
+
+
+interval_rows = []
+for pos, axes_dict in POSITION_AXES.items():
+    peer_df = qualified[qualified['position'] == pos]
+    rows    = boot_row.reindex(peer_df['id']).values.astype(int)
+    for label, col in axes_dict.items():
+        if col not in peer_df.columns:
+            continue
+        vals = boot_axis_values(col)
+        if vals is None:
+            continue
+        peer_vals = peer_df[col].values
+        lo, hi = percentile_interval(rank_percentiles(vals[rows], peer_vals))
+        interval_rows.append(pd.DataFrame({
+            'id': peer_df['id'].values, 'web_name': peer_df['web_name'].values,
+            'team_code': peer_df['team_code'].values, 'position': pos,
+            'minutes': peer_df['minutes'].values, 'axis': col,
+            'pct': rank_percentiles(peer_vals, peer_vals), 'pct_lo': lo, 'pct_hi': hi,
+        }))
+
+intervals = pd.concat(interval_rows, ignore_index=True)
+intervals.to_csv(os.path.join(ASSETS_DIR, 'player_percentile_intervals.csv'), index=False)
+band_lookup = intervals.set_index(['id', 'axis'])[['pct_lo', 'pct_hi']]
+print(f"  Intervals for {intervals['id'].nunique()} players → assets/player_percentile_intervals.csv")
+
+
+def percentile_band(player_id, axes_dict, pcts):
+    """(lo, hi) lists aligned to axes_dict; axes without an interval collapse to the point."""
+    lo, hi = [], []
+    for (label, col), p in zip(axes_dict.items(), pcts):
+        if (player_id, col) in band_lookup.index:
+            l, h = band_lookup.loc[(player_id, col)]
+            lo.append(float(l)); hi.append(float(h))
+        else:
+            lo.append(p); hi.append(p)
+    return lo, hi
+
 # ── Radar drawing helper ───────────────────────────────────────────────────────
 EVERTON_BLUE  = '#003399'
 EVERTON_GOLD  = '#FFD700'
@@ -181,8 +247,9 @@ BG_COLOUR     = '#0d1117'
 GRID_COLOUR   = '#2a2a3a'
 
 def draw_radar(ax, percentiles, labels, player_name, position,
-               team_name='Everton', colour=EVERTON_BLUE, avg_percentiles=None):
-    """Draw a single player radar on `ax`."""
+               team_name='Everton', colour=EVERTON_BLUE, avg_percentiles=None,
+               pct_band=None):
+    """Draw a single player radar on `ax` (pct_band = optional (lo, hi) shading)."""
     N = len(labels)
     angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
     angles += angles[:1]
@@ -210,6 +277,12 @@ def draw_radar(ax, percentiles, labels, player_name, position,
         ax.fill(angles, avg_vals, color='#ffffff', alpha=0.08, zorder=3)
         ax.plot(angles, avg_vals, color='#ffffff', lw=1.0, alpha=0.4, linestyle='--', zorder=4)
 
+    # Bootstrap interval band
+    if pct_band is not None:
+        lo, hi = pct_band
+        ax.fill_between(angles, list(lo) + [lo[0]], list(hi) + [hi[0]],
+                        color=EVERTON_GOLD, alpha=0.18, lw=0, zorder=4)
+
     # Player fill
     ax.fill(angles, vals, color=colour, alpha=0.35, zorder=5)
     ax.plot(angles, vals, color=colour, lw=2.2, zorder=6)
@@ -269,15 +342,17 @@ for _, player in everton_sorted.iterrows():
     labels  = list(available_axes.keys())
     pcts    = compute_percentiles(player, peer_df, available_axes)
     avg_pct = compute_avg_percentiles(peer_df, available_axes)
+    band    = percentile_band(player['id'], available_axes, pcts)
 
     fig = plt.figure(figsize=(6, 6), facecolor=BG_COLOUR)
     ax  = fig.add_subplot(111, polar=True, facecolor=BG_COLOUR)
 
-    draw_radar(ax, pcts, labels, player['web_name'], pos, avg_percentiles=avg_pct)
+    draw_radar(ax, pcts, labels, player['web_name'], pos, avg_percentiles=avg_pct,
+               pct_band=band if BOOTSTRAP_BANDS else None)
 
     # Percentile annotation box
-    ann_text = '\n'.join([f"{lbl.replace(chr(10),' ')}: {p:.0f}th"
-                          for lbl, p in zip(labels, pcts)])
+    ann_text = '\n'.join([f"{lbl.replace(chr(10),' ')}: {p:.0f}th ({l:.0f}–{h:.0f})"
+                          for lbl, p, l, h in zip(labels, pcts, *band)])
     fig.text(0.01, 0.01, ann_text, color='#aaaacc', fontsize=5.5,
              va='bottom', ha='left',
              bbox=dict(boxstyle='round,pad=0.3', facecolor='#1a1a2e', alpha=0.7))
@@ -298,6 +373,9 @@ for _, player in everton_sorted.iterrows():
                    label='League avg (50th)'),
         plt.scatter([], [], c=EVERTON_GOLD, s=20, label='Axis score', edgecolors='white', linewidths=0.3),
     ]
+    if BOOTSTRAP_BANDS:
+        legend_patches.append(mpatches.Patch(color=EVERTON_GOLD, alpha=0.25,
+                                             label=f'{CI[1] - CI[0]}% bootstrap interval'))
     ax.legend(handles=legend_patches, loc='lower right',
               bbox_to_anchor=(1.30, -0.10),
               fontsize=6, facecolor='#1a1a2e', labelcolor='white',
@@ -308,7 +386,7 @@ for _, player in everton_sorted.iterrows():
     fig.savefig(out_path, dpi=160, bbox_inches='tight',
                 facecolor=BG_COLOUR, edgecolor='none')
     plt.close(fig)
-    individual_files.append((player['web_name'], pos, player['minutes'], pcts, labels, out_path))
+    individual_files.append((player['web_name'], pos, player['minutes'], pcts, labels, band, out_path))
     print(f"  Saved: everton_player_radar_{safe_name}.png  "
           f"({player['minutes']:.0f} min, {pos})")
 
@@ -328,7 +406,7 @@ else:
                  color=EVERTON_GOLD, fontsize=12, fontweight='bold',
                  y=0.98)
 
-    for i, (name, pos, mins, pcts, labels, _) in enumerate(individual_files):
+    for i, (name, pos, mins, pcts, labels, band, _) in enumerate(individual_files):
         axes_dict = POSITION_AXES[pos]
         available_axes = {lbl: col for lbl, col in axes_dict.items()
                           if col in qualified.columns}
@@ -337,7 +415,7 @@ else:
 
         ax = fig.add_subplot(nrows, ncols, i + 1, polar=True)
         draw_radar(ax, pcts, labels, f'{name}  ({int(mins)} min)', pos,
-                   avg_percentiles=avg_pct)
+                   avg_percentiles=avg_pct, pct_band=band if BOOTSTRAP_BANDS else None)
 
     grid_path = os.path.join(ASSETS_DIR, 'everton_player_radars.png')
     fig.savefig(grid_path, dpi=140, bbox_inches='tight',
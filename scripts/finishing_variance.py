@@ -0,0 +1,274 @@
+"""
+scripts/finishing_variance.py
+Exact finishing-variance engine -- Poisson-binomial goal distributions from shot xG.
+
+The GW26 autopsy labels EVE v BOU "Finishing Variance" and WOL v ARS a black
+swan from point comparisons (pre_match = {'Everton': 1.06, ...}, "+1.62 goals
+above model expectancy"). Here every shot is a Bernoulli trial with p = xG, so
+the goals scored by a team in a match (or a player across a season) follow a
+Poisson-binomial distribution. Its exact pmf is the product
+
+    prod_i (1 - p_i + p_i z)
+
+built by batched convolution: groups are sorted by shot count, padded in
+chunks (padding p = 0 is a no-op factor) and all pmfs in a chunk are updated
+together one shot-slot at a time -- no per-match loop, no simulation.
+
+Each group gets the tails of its observed goals and a mid-p "luck" percentile
+
+    luck = 100 * (P(G < g) + 0.5 P(G = g))
+
+~50 = finished to xG, < LUCK_TAILS[0] = under-converted (Finishing Variance),
+> LUCK_TAILS[1] = over-converted. Pre-match model expectancy can be scored the
+same way against a Poisson(λ) distribution (model_expectancy_tail).
+
+Shots CSV columns: season, match_id, team, player, xg, goal (0/1)
+  [, own_goal (0/1, row names the benefiting team), opponent].
+Optional results CSV (season, match_id, team, goals) gives the full team score
+and names sides that had no shots.
+"""
+import time, argparse
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson
+
+LUCK_TAILS = (5.0, 95.0)   # percentile bounds for the variance flags
+CHUNK      = 512           # groups per padded batch
+
+
+# ── Poisson-binomial pmfs ─────────────────────────────────────────────────────
+def _padded(codes, xg, n_groups):
+    """Shot probabilities grouped by code -> (n_groups, max_shots) array padded with 0."""
+    order = np.argsort(codes, kind='stable')
+    codes, xg = codes[order], xg[order]
+    n_shots = np.bincount(codes, minlength=n_groups)
+    starts  = np.concatenate([[0], np.cumsum(n_shots)[:-1]])
+    pos     = np.arange(len(codes)) - starts[codes]
+    P = np.zeros((n_groups, int(n_shots.max()) if len(codes) else 0))
+    P[codes, pos] = xg
+    return P, n_shots
+
+
+def _convolve_batch(P):
+    """(G, S) shot probabilities -> (G, S + 1) exact goal pmfs."""
+    G, S = P.shape
+    pmf = np.zeros((G, S + 1))
+    pmf[:, 0] = 1.0
+    for k in range(S):
+        p = P[:, k:k + 1]
+        pmf[:, 1:k + 2] = pmf[:, 1:k + 2] * (1.0 - p) + pmf[:, :k + 1] * p
+        pmf[:, 0] *= 1.0 - P[:, k]
+    return pmf
+
+
+def poisson_binomial(codes, xg, n_groups=None):
+    """Exact goal pmfs for every group.
+
+    codes -- (n_shots,) integer group ids in [0, n_groups)
+    xg    -- (n_shots,) shot probabilities
+    Returns (n_groups, max_shots + 1) pmf matrix; row g is zero beyond its shot count.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    xg    = np.clip(np.asarray(xg, dtype=float), 0.0, 1.0)
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1
+    P, n_shots = _padded(codes, xg, n_groups)
+    pmf = np.zeros((n_groups, P.shape[1] + 1))
+    by_size = np.argsort(n_shots, kind='stable')
+    for start in range(0, n_groups, CHUNK):
+        idx = by_size[start:start + CHUNK]
+        width = int(n_shots[idx].max())
+        pmf[idx, :width + 1] = _convolve_batch(P[idx, :width])
+    return pmf
+
+
+def goal_tails(pmf, goals):
+    """Tail probabilities and mid-p luck percentile of observed goals under each pmf row."""
+    goals = np.asarray(goals, dtype=np.intp)
+    cdf   = np.cumsum(pmf, axis=1)
+    rows  = np.arange(len(goals))
+    inside = goals < pmf.shape[1]
+    g = np.minimum(goals, pmf.shape[1] - 1)
+    p_eq  = np.where(inside, pmf[rows, g], 0.0)
+    p_le  = np.where(inside, cdf[rows, g], 1.0)
+    p_lt  = p_le - p_eq
+    return {
+        'p_ge': np.clip(1.0 - p_lt, 0.0, 1.0),
+        'p_le': np.clip(p_le, 0.0, 1.0),
+        'luck_pct': 100.0 * np.clip(p_lt + 0.5 * p_eq, 0.0, 1.0),
+    }
+
+
+def model_expectancy_tail(expected, goals):
+    """Same tails against a pre-match Poisson(λ) expectancy (e.g. xG_Home from the blend)."""
+    lam   = np.asarray(expected, dtype=float)
+    goals = np.asarray(goals, dtype=float)
+    p_eq  = poisson.pmf(goals, lam)
+    p_lt  = poisson.cdf(goals - 1, lam)
+    return {'p_ge': 1.0 - p_lt, 'p_le': p_lt + p_eq, 'luck_pct': 100.0 * (p_lt + 0.5 * p_eq)}
+
+
+def variance_flag(luck_pct, tails=LUCK_TAILS):
+    return np.select([luck_pct < tails[0], luck_pct > tails[1]],
+                     ['Finishing Variance (under)', 'Finishing Variance (over)'],
+                     'Within range')
+
+
+# ── Group tables ──────────────────────────────────────────────────────────────
+TEAM_KEYS   = ['season', 'match_id', 'team']
+PLAYER_KEYS = ['season', 'player', 'team']
+
+
+def _own_goal_mask(shots):
+    if 'own_goal' not in shots.columns:
+        return np.zeros(len(shots), dtype=bool)
+    return shots['own_goal'].fillna(0).to_numpy(dtype=float) > 0
+
+
+def variance_table(shots, keys, extra_groups=None):
+    """One row per group: shots, xG, goals, exact tails, luck percentile, flag.
+
+    extra_groups -- frame of additional key rows (e.g. sides with no shots);
+                    they get shots = 0 and the pmf [1, 0, ...].
+    Also returns the pmf matrix (rows aligned with the table) for downstream use.
+    """
+    frames = [shots[keys]] + ([extra_groups[keys]] if extra_groups is not None else [])
+    table  = (pd.concat(frames, ignore_index=True).drop_duplicates()
+                .sort_values(keys).reset_index(drop=True))
+    codes  = pd.MultiIndex.from_frame(table).get_indexer(pd.MultiIndex.from_frame(shots[keys]))
+    xg     = shots['xg'].to_numpy(dtype=float)
+    goal   = shots['goal'].to_numpy(dtype=float)
+    n      = len(table)
+    pmf    = poisson_binomial(codes, xg, n)
+    goals  = np.bincount(codes, weights=goal, minlength=n).astype(int)
+    tails  = goal_tails(pmf, goals)
+
+    table['shots'] = np.bincount(codes, minlength=n)
+    table['xg']    = np.bincount(codes, weights=xg, minlength=n)
+    table['goals'] = goals
+    table['goals_minus_xg'] = goals - table['xg']
+    table = table.assign(**tails)
+    table['flag'] = variance_flag(table['luck_pct'].values)
+    return table, pmf
+
+
+def team_match_variance(shots, results=None):
+    """Per team-match table + pmfs; observed goals include own goals.
+
+    Own goals come from an `own_goal` (0/1) column -- those rows name the
+    benefiting team and are kept out of the shot distribution -- or from
+    `results` (season, match_id, team, goals: the full team score), which
+    takes precedence. Sides with no shots enter via `results` or an
+    `opponent` column on the shots and get the pmf [1, 0, ...].
+    """
+    og     = _own_goal_mask(shots)
+    real   = shots[~og]
+    extra  = [shots.loc[og, TEAM_KEYS]]
+    if 'opponent' in shots.columns:
+        extra.append(shots[['season', 'match_id', 'opponent']].rename(columns={'opponent': 'team'}))
+    if results is not None:
+        extra.append(results[TEAM_KEYS])
+    table, pmf = variance_table(real, TEAM_KEYS, pd.concat(extra, ignore_index=True))
+
+    idx = pd.MultiIndex.from_frame(table[TEAM_KEYS])
+    og_codes = idx.get_indexer(pd.MultiIndex.from_frame(shots.loc[og, TEAM_KEYS]))
+    table['own_goals'] = np.bincount(og_codes, minlength=len(table)).astype(int)
+    goals = table['goals'].values + table['own_goals'].values
+    if results is not None:
+        scored = results.set_index(TEAM_KEYS)['goals'].reindex(idx).to_numpy(dtype=float)
+        goals  = np.where(np.isnan(scored), goals, scored).astype(int)
+    table['goals'] = goals
+    table['goals_minus_xg'] = goals - table['xg']
+    table = table.assign(**goal_tails(pmf, goals))
+    table['flag'] = variance_flag(table['luck_pct'].values)
+    return table, pmf
+
+
+def player_season_variance(shots, min_shots=10):
+    """Per player-season table (own goals are not credited to any player)."""
+    table, pmf = variance_table(shots[~_own_goal_mask(shots)], PLAYER_KEYS)
+    keep = table['shots'].values >= min_shots
+    return table[keep].reset_index(drop=True), pmf[keep]
+
+
+def match_outcomes(team_table, pmf):
+    """Shot-deserved result per match: P(win / draw / loss) for each side from the
+    two exact pmfs, plus the expected points the chances were worth.
+
+    A match with only one side in the table (opponent had no shots and was not
+    named) is kept: the missing side is a certain 0 with an unknown name.
+    """
+    rows  = team_table.reset_index(drop=True)
+    pairs = rows.groupby(['season', 'match_id']).indices
+    sizes = {k: len(v) for k, v in pairs.items() if len(v) > 2}
+    if sizes:
+        raise ValueError(f"More than two teams for match(es) {list(sizes)[:5]}")
+    if not pairs:
+        return pd.DataFrame()
+    a_idx = np.array([v[0] for v in pairs.values()])
+    b_idx = np.array([v[1] if len(v) == 2 else -1 for v in pairs.values()])
+    solo  = b_idx < 0
+
+    K = pmf.shape[1]
+    nil = np.zeros(K)
+    nil[0] = 1.0
+    A = pmf[a_idx]
+    B = np.where(solo[:, None], nil, pmf[np.where(solo, 0, b_idx)])
+    cdf_b = np.cumsum(B, axis=1)
+    below = np.concatenate([np.zeros((len(B), 1)), cdf_b[:, :-1]], axis=1)  # P(B < k)
+    p_win  = np.sum(A * below, axis=1)
+    p_draw = np.sum(A * B, axis=1)
+    p_loss = 1.0 - p_win - p_draw
+
+    def other(col, fill):
+        vals = rows[col].to_numpy(dtype=object)[np.where(solo, 0, b_idx)]
+        return np.where(solo, fill, vals)
+
+    out = pd.DataFrame({
+        'season':   rows.loc[a_idx, 'season'].values,
+        'match_id': rows.loc[a_idx, 'match_id'].values,
+        'team':     rows.loc[a_idx, 'team'].values,
+        'opponent': other('team', None),
+        'goals':    rows.loc[a_idx, 'goals'].values,
+        'goals_against': other('goals', 0).astype(int),
+        'xg':       rows.loc[a_idx, 'xg'].values,
+        'xg_against': other('xg', 0.0).astype(float),
+        'p_win': p_win, 'p_draw': p_draw, 'p_loss': p_loss,
+    })
+    out['xpts_team']     = 3 * p_win + p_draw
+    out['xpts_opponent'] = 3 * p_loss + p_draw
+    return out
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Exact Poisson-binomial finishing variance')
+    ap.add_argument('--shots', required=True,
+                    help='CSV with season, match_id, team, player, xg, goal [, own_goal, opponent]')
+    ap.add_argument('--results', default=None,
+                    help='optional CSV with season, match_id, team, goals (full team score)')
+    ap.add_argument('--min-shots', type=int, default=10)
+    args = ap.parse_args()
+
+    shots = pd.read_csv(args.shots)
+    scores = pd.read_csv(args.results) if args.results else None
+
+    t0 = time.perf_counter()
+    teams, team_pmf = team_match_variance(shots, scores)
+    players, _      = player_season_variance(shots, args.min_shots)
+    results         = match_outcomes(teams, team_pmf)
+    t1 = time.perf_counter()
+
+    print(f"{len(shots)} shots -> {len(teams)} team-matches, {len(players)} player-seasons "
+          f"in {t1 - t0:.2f}s")
+    cols = ['season', 'match_id', 'team', 'shots', 'xg', 'goals', 'own_goals',
+            'p_ge', 'p_le', 'luck_pct', 'flag']
+    print("\nLeast fortunate team-matches (lowest luck percentile):")
+    print(teams.nsmallest(10, 'luck_pct')[cols].to_string(index=False, float_format='%.3f'))
+    print("\nMost fortunate team-matches:")
+    print(teams.nlargest(10, 'luck_pct')[cols].to_string(index=False, float_format='%.3f'))
+    pcols = ['season', 'player', 'team', 'shots', 'xg', 'goals', 'luck_pct', 'flag']
+    print("\nPlayer-season finishing outliers:")
+    flagged = players[players['flag'] != 'Within range'].sort_values('luck_pct')
+    print(flagged[pcols].to_string(index=False, float_format='%.3f'))
+    if len(results):
+        print(f"\nShot-deserved points table built for {len(results)} matches.")
@@ -0,0 +1,223 @@
+"""
+scripts/incremental_boost.py
+Incremental gameweek updates for the LightGBM component of the Dynamic Blend.
+
+Instead of retraining from scratch every time new matches settle, each
+gameweek continues boosting from the live booster on a bounded window of
+the most recent settled matches (the new gameweek plus enough recent history
+to reach UPDATE_WINDOW rows -- a single gameweek alone is too small to split
+on), adding at most ADD_TREES trees. Cost per week is therefore constant:
+
+  1. Walk-forward check -- the live booster and its parent (the model before
+     the last update) are both scored on the new gameweek, which neither has
+     seen. If the last update made Brier worse by more than ROLLBACK_TOL it is
+     rolled back and boosting restarts from the parent instead.
+  2. Continue boosting from the chosen base on the recent window, binned with
+     the cached reference Dataset (bin boundaries are never recomputed for
+     the history).
+  3. Every FULL_REBUILD_EVERY updates, or once the booster exceeds MAX_TREES,
+     a full rebuild re-bins the whole history and resets accumulated drift.
+
+Cache layout (CACHE_DIR):
+  history.npz         -- all settled feature rows + labels (no CSV re-reads)
+  reference.bin       -- LightGBM binary Dataset holding the bin mappers
+  booster_live.txt    -- current model
+  booster_parent.txt  -- model before the last incremental update
+  state.json          -- counters + per-update log
+
+Run directly to replay sample_dataset.csv week by week.
+"""
+import os, json, time, argparse
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+
+BASE      = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+CACHE_DIR = os.path.join(BASE, 'models', 'lgbm_incremental')
+
+FEATURE_COLS = ['elo_diff', 'xg_diff', 'dc_home_attack', 'dc_away_defence',
+                'form_home_5', 'form_away_5', 'rest_days_home', 'rest_days_away']
+CLASS_MAP    = {'H': 0, 'D': 1, 'A': 2}
+
+LGB_PARAMS = {
+    'objective':        'multiclass',
+    'num_class':        3,
+    'learning_rate':    0.05,
+    'num_leaves':       15,
+    'min_data_in_leaf': 10,
+    'max_bin':          63,
+    'verbose':          -1,
+}
+FULL_TREES         = 300    # rounds for a from-scratch build
+ADD_TREES          = 20     # max rounds added per gameweek
+MAX_TREES          = 600    # force a rebuild past this size (per class)
+FULL_REBUILD_EVERY = 8      # incremental updates between full rebuilds
+ROLLBACK_TOL       = 0.002  # allowed walk-forward Brier deterioration
+UPDATE_WINDOW      = 200    # most recent settled rows boosted on per update
+
+
+def multiclass_brier(probs, y):
+    """Mean over matches of sum_k (p_k - 1[y=k])^2 for H/D/A."""
+    onehot = np.eye(probs.shape[1])[y]
+    return float(np.mean(np.sum((probs - onehot) ** 2, axis=1)))
+
+
+class IncrementalBooster:
+    """LightGBM booster that is extended gameweek by gameweek, with rollback."""
+
+    def __init__(self, cache_dir=CACHE_DIR, params=None, full_trees=FULL_TREES,
+                 add_trees=ADD_TREES, max_trees=MAX_TREES,
+                 full_rebuild_every=FULL_REBUILD_EVERY, rollback_tol=ROLLBACK_TOL,
+                 update_window=UPDATE_WINDOW):
+        self.cache_dir          = cache_dir
+        self.params             = dict(LGB_PARAMS if params is None else params)
+        self.full_trees         = full_trees
+        self.add_trees          = add_trees
+        self.max_trees          = max_trees
+        self.full_rebuild_every = full_rebuild_every
+        self.rollback_tol       = rollback_tol
+        self.update_window      = update_window
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.live      = None
+        self.parent    = None
+        self.reference = None
+        self.X_hist    = np.empty((0, len(FEATURE_COLS)))
+        self.y_hist    = np.empty(0, dtype=int)
+        self.state     = {'updates_since_full': 0, 'log': []}
+        self._load()
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self):
+        if not os.path.exists(self._path('state.json')):
+            return
+        with open(self._path('state.json')) as f:
+            self.state = json.load(f)
+        hist = np.load(self._path('history.npz'))
+        self.X_hist, self.y_hist = hist['X'], hist['y']
+        self.live = lgb.Booster(model_file=self._path('booster_live.txt'))
+        if os.path.exists(self._path('booster_parent.txt')):
+            self.parent = lgb.Booster(model_file=self._path('booster_parent.txt'))
+        self.reference = lgb.Dataset(self._path('reference.bin'), params=self.params).construct()
+
+    def _save(self):
+        np.savez(self._path('history.npz'), X=self.X_hist, y=self.y_hist)
+        self.live.save_model(self._path('booster_live.txt'))
+        if self.parent is not None:
+            self.parent.save_model(self._path('booster_parent.txt'))
+        elif os.path.exists(self._path('booster_parent.txt')):
+            os.remove(self._path('booster_parent.txt'))
+        tmp = self._path('state.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp, self._path('state.json'))
+
+    # ── Training ──────────────────────────────────────────────────────────────
+    def fit_full(self, X=None, y=None, log=None):
+        """Re-bin the full history and train from scratch (resets drift).
+
+        The rebuilt booster has no parent: rolling back to the pre-rebuild model
+        would resume boosting the drifted trees. `log` adds fields to the saved
+        log entry.
+        """
+        if X is not None:
+            self.X_hist = np.asarray(X, dtype=float)
+            self.y_hist = np.asarray(y, dtype=int)
+        t0 = time.perf_counter()
+        ds = lgb.Dataset(self.X_hist, self.y_hist, params=self.params,
+                         feature_name=FEATURE_COLS, free_raw_data=False).construct()
+        bin_path = self._path('reference.bin')
+        if os.path.exists(bin_path):
+            os.remove(bin_path)          # save_binary will not overwrite
+        ds.save_binary(bin_path)
+        self.reference = ds
+        self.parent    = None
+        self.live      = lgb.train(self.params, ds, num_boost_round=self.full_trees,
+                                   keep_training_booster=True)
+        self.state['updates_since_full'] = 0
+        self.state['log'].append({'action': 'full_rebuild', 'rows': int(len(self.y_hist)),
+                                  'trees': self.live.current_iteration(),
+                                  'seconds': round(time.perf_counter() - t0, 3), **(log or {})})
+        self._save()
+        return self.state['log'][-1]
+
+    def _extend(self, base, X, y):
+        ds = lgb.Dataset(X, y, reference=self.reference, params=self.params,
+                         feature_name=FEATURE_COLS)
+        return lgb.train(self.params, ds, num_boost_round=self.add_trees,
+                         init_model=base, keep_training_booster=True)
+
+    def update(self, X_new, y_new):
+        """Absorb one settled gameweek; returns the log entry for this step."""
+        if self.live is None:
+            raise RuntimeError("No live booster -- call fit_full() on the history first")
+        X_new = np.asarray(X_new, dtype=float)
+        y_new = np.asarray(y_new, dtype=int)
+        t0 = time.perf_counter()
+
+        # 1. Walk-forward scores on matches neither booster has seen
+        wf_live   = multiclass_brier(self.live.predict(X_new), y_new)
+        wf_parent = (multiclass_brier(self.parent.predict(X_new), y_new)
+                     if self.parent is not None else None)
+
+        self.X_hist = np.vstack([self.X_hist, X_new])
+        self.y_hist = np.concatenate([self.y_hist, y_new])
+
+        # 3. Bounded drift: periodic full rebuild
+        due = (self.state['updates_since_full'] + 1 >= self.full_rebuild_every or
+               self.live.current_iteration() + self.add_trees > self.max_trees)
+        if due:
+            return self.fit_full(log={'walk_forward_brier': wf_live, 'parent_brier': wf_parent})
+
+        # 2. Continue boosting (rolling back the last step if it hurt)
+        rolled_back = wf_parent is not None and wf_live > wf_parent + self.rollback_tol
+        base  = self.parent if rolled_back else self.live
+        n_fit = max(len(y_new), self.update_window)
+        X_fit, y_fit = self.X_hist[-n_fit:], self.y_hist[-n_fit:]
+
+        self.parent = base
+        self.live   = self._extend(base, X_fit, y_fit)
+        self.state['updates_since_full'] += 1
+        entry = {'action': 'rollback+extend' if rolled_back else 'extend',
+                 'rows': int(len(y_fit)), 'trees': self.live.current_iteration(),
+                 'walk_forward_brier': wf_live, 'parent_brier': wf_parent,
+                 'seconds': round(time.perf_counter() - t0, 3)}
+        self.state['log'].append(entry)
+        self._save()
+        return entry
+
+    def predict(self, X):
+        return self.live.predict(np.asarray(X, dtype=float))
+
+
+# ── Demo: replay sample_dataset.csv gameweek by gameweek ─────────────────────
+if __name__ == '__main__':
+    import tempfile
+
+    ap = argparse.ArgumentParser(description='Replay incremental LightGBM updates')
+    ap.add_argument('--data', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   '..', 'sample_dataset.csv'))
+    ap.add_argument('--cache-dir', default=None)
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.data)
+    df['match_date'] = pd.to_datetime(df['match_date'])
+    df = df.sort_values('match_date').reset_index(drop=True)
+    df['y']    = df['actual_result'].map(CLASS_MAP)
+    df['week'] = df['match_date'].dt.to_period('W')
+
+    season_boundary = pd.Timestamp('2025-08-01')
+    train = df[df['match_date'] < season_boundary]
+    test  = df[df['match_date'] >= season_boundary]
+
+    model = IncrementalBooster(args.cache_dir or tempfile.mkdtemp())
+    first = model.fit_full(train[FEATURE_COLS].values, train['y'].values)
+    print(f"Full build: {first['rows']} rows, {first['trees']} trees, {first['seconds']:.2f}s")
+
+    for week, gw in test.groupby('week'):
+        e = model.update(gw[FEATURE_COLS].values, gw['y'].values)
+        print(f"  {week}  {e['action']:<16} rows={e['rows']:>3}  trees={e['trees']:>3}  "
+              f"WF Brier={e['walk_forward_brier']:.4f}  {e['seconds']:.3f}s")
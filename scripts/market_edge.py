@@ -0,0 +1,283 @@
+"""
+scripts/market_edge.py
+Vectorised market de-vigging and model-vs-market edge analytics.
+
+Generalises the hand-built GW26_PREDICTION_MARKET_COMPARISON.csv analysis to
+the full odds history (every gameweek, season and bookmaker at once):
+
+  * de-vig  -- multiplicative, power and Shin; power and Shin solve their
+               root-finding problem for every row simultaneously (batched
+               Newton / batched bisection), never per row
+  * edge    -- model probability minus fair market probability, and EV at
+               the quoted price
+  * CLV     -- opening price vs de-vigged closing probability
+  * segmentation by bookmaker and season
+
+Input is long form, one row per (match, bookmaker):
+  match_id, bookmaker, odds_H, odds_D, odds_A [, close_H, close_D, close_A]
+football_data_to_long() builds this from football-data.co.uk style wide
+columns (B365H / B365CH, PSH / PSCH, ...).
+
+match_id is a stable key -- 'YYYY-MM-DD|home|away' with team names normalised
+through TEAM_ALIASES -- so model output (GW26_PREDICTION_MARKET_COMPARISON.csv,
+sample_dataset.csv, ...) joins on it without sharing any row numbering.
+"""
+import os, glob, time, argparse
+import numpy as np
+import pandas as pd
+
+BASE     = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+ODDS_GLOB = os.path.join(BASE, 'RAW_DATA', 'football_data', 'E0_*.csv')
+
+OUTCOMES = ['H', 'D', 'A']
+BOOKS    = ['B365', 'PS', 'WH', 'BW', 'IW', 'VC', 'Max', 'Avg']
+METHODS  = ['multiplicative', 'power', 'shin']
+MIN_EV   = 0.0     # flat-stake value-bet threshold
+
+# Name variants seen across model output and odds feeds -> one canonical form
+TEAM_ALIASES = {
+    'manchester united': 'man united', 'man utd': 'man united',
+    'manchester city': 'man city',
+    'west ham united': 'west ham',
+    'tottenham hotspur': 'tottenham', 'spurs': 'tottenham',
+    'newcastle united': 'newcastle',
+    'brighton & hove albion': 'brighton', 'brighton and hove albion': 'brighton',
+    'wolverhampton': 'wolves', 'wolverhampton wanderers': 'wolves',
+    'leicester city': 'leicester', 'leeds united': 'leeds',
+    'afc bournemouth': 'bournemouth',
+    'nottingham forest': "nott'm forest", 'nottm forest': "nott'm forest",
+    'ipswich town': 'ipswich', 'luton town': 'luton',
+    'sheffield utd': 'sheffield united', 'west bromwich albion': 'west brom',
+}
+DATE_COLS = ['match_date', 'date', 'Date']
+HOME_COLS = ['home_team', 'HomeTeam', 'Home', 'home']
+AWAY_COLS = ['away_team', 'AwayTeam', 'Away', 'away']
+
+
+# ── De-vig methods (all take an (N, 3) array of decimal odds) ────────────────
+def implied(odds):
+    return 1.0 / np.asarray(odds, dtype=float)
+
+
+def devig_multiplicative(odds):
+    q = implied(odds)
+    return q / q.sum(axis=1, keepdims=True)
+
+
+def devig_power(odds, tol=1e-12, max_iter=50):
+    """p_i = q_i^k with k chosen per row so sum(p) = 1 (batched Newton)."""
+    q    = implied(odds)
+    logq = np.log(q)
+    k    = np.ones(len(q))
+    active = np.ones(len(q), dtype=bool)
+    for _ in range(max_iter):
+        qk = q[active] ** k[active, None]
+        f  = qk.sum(axis=1) - 1.0
+        fp = (qk * logq[active]).sum(axis=1)
+        step = f / fp
+        k[active] -= step
+        idx = np.flatnonzero(active)
+        active[idx[np.abs(step) < tol]] = False
+        if not active.any():
+            break
+    return q ** k[:, None]
+
+
+def devig_shin(odds, tol=1e-12, max_iter=60):
+    """Shin (1993) insider-trading model; z solved per row by batched bisection.
+
+    p_i(z) = (sqrt(z^2 + 4 (1 - z) q_i^2 / Q) - z) / (2 (1 - z)),  Q = sum q
+    sum_i p_i(z) is decreasing in z, so z is bracketed in [0, 1).
+    Returns (probs, z).
+    """
+    q = implied(odds)
+    Q = q.sum(axis=1, keepdims=True)
+
+    def probs(z):
+        z = z[:, None]
+        return (np.sqrt(z ** 2 + 4 * (1 - z) * q ** 2 / Q) - z) / (2 * (1 - z))
+
+    lo = np.zeros(len(q))
+    hi = np.full(len(q), 0.999)
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        over = probs(mid).sum(axis=1) > 1.0
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+        if np.max(hi - lo) < tol:
+            break
+    z = 0.5 * (lo + hi)
+    p = probs(z)
+    return p / p.sum(axis=1, keepdims=True), z
+
+
+def devig(odds, method='shin'):
+    if method == 'multiplicative':
+        return devig_multiplicative(odds)
+    if method == 'power':
+        return devig_power(odds)
+    if method == 'shin':
+        return devig_shin(odds)[0]
+    raise ValueError(f"Unknown de-vig method {method!r} -- expected one of {METHODS}")
+
+
+# ── Match keys ────────────────────────────────────────────────────────────────
+def normalise_team(names):
+    s = pd.Series(names, dtype=str).str.strip().str.lower().str.split().str.join(' ')
+    return s.replace(TEAM_ALIASES)
+
+
+def _parse_dates(dates):
+    """ISO dates as-is, football-data dd/mm/yy(yy) day-first."""
+    s   = pd.Series(dates).astype(str).str.strip()
+    iso = s.str.match(r'^\d{4}-')
+    out = pd.Series(pd.NaT, index=s.index, dtype='datetime64[ns]')
+    out[iso]  = pd.to_datetime(s[iso], format='ISO8601')
+    out[~iso] = pd.to_datetime(s[~iso], dayfirst=True, format='mixed')
+    return out
+
+
+def match_key(dates, home, away):
+    """'YYYY-MM-DD|home|away' keys from any date format and team-name variant."""
+    d = _parse_dates(dates).dt.strftime('%Y-%m-%d').values
+    return pd.Series(d, dtype=str).str.cat([normalise_team(home).values,
+                                            normalise_team(away).values], sep='|').values
+
+
+def add_match_key(df):
+    """Add match_id from the frame's own date / home / away columns."""
+    def pick(cands):
+        for c in cands:
+            if c in df.columns:
+                return c
+        raise KeyError(f"No column among {cands} to build match_id")
+    df = df.copy()
+    df['match_id'] = match_key(df[pick(DATE_COLS)].values, df[pick(HOME_COLS)].values,
+                               df[pick(AWAY_COLS)].values)
+    return df
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+def football_data_to_long(raw, books=BOOKS):
+    """Melt football-data wide odds columns to one row per (match, bookmaker)."""
+    raw = raw.reset_index(drop=True)
+    keys = match_key(raw['Date'].values, raw['HomeTeam'].values, raw['AwayTeam'].values)
+    base_cols = [c for c in ['Date', 'Season', 'HomeTeam', 'AwayTeam', 'FTR'] if c in raw.columns]
+    frames = []
+    for b in books:
+        open_cols  = [f'{b}{o}' for o in OUTCOMES]
+        close_cols = [f'{b}C{o}' for o in OUTCOMES]
+        if not set(open_cols) <= set(raw.columns):
+            continue
+        f = raw[base_cols].copy()
+        f['match_id']  = keys
+        f['bookmaker'] = b
+        f[['odds_H', 'odds_D', 'odds_A']] = raw[open_cols].values
+        if set(close_cols) <= set(raw.columns):
+            f[['close_H', 'close_D', 'close_A']] = raw[close_cols].values
+        frames.append(f)
+    out = pd.concat(frames, ignore_index=True)
+    out = out.rename(columns={'Date': 'date', 'Season': 'season', 'HomeTeam': 'home_team',
+                              'AwayTeam': 'away_team', 'FTR': 'actual_result'})
+    return out.dropna(subset=['odds_H', 'odds_D', 'odds_A']).reset_index(drop=True)
+
+
+# ── Analysis ──────────────────────────────────────────────────────────────────
+def analyse_market(odds_long, model_probs=None, method='shin'):
+    """Add overround, fair probs (all methods), edge, EV and CLV columns.
+
+    model_probs -- optional frame with prob_H/prob_D/prob_A (or Blend_H/Blend_D/Blend_A)
+                   and either match_id or date + home / away columns to build it;
+                   merged on match_id.
+    """
+    df = odds_long.copy()
+    if model_probs is not None:
+        mp = model_probs if 'match_id' in model_probs.columns else add_match_key(model_probs)
+        mp = mp.rename(columns={f'Blend_{o}': f'prob_{o}' for o in OUTCOMES})
+        if mp['match_id'].duplicated().any():
+            raise ValueError("model_probs has duplicate match_id rows")
+        df = df.merge(mp[['match_id'] + [f'prob_{o}' for o in OUTCOMES]], on='match_id', how='left')
+
+    odds = df[['odds_H', 'odds_D', 'odds_A']].values
+    df['overround'] = implied(odds).sum(axis=1) - 1.0
+    for m in METHODS:
+        fair = devig(odds, m)
+        for j, o in enumerate(OUTCOMES):
+            df[f'fair_{m}_{o}'] = fair[:, j]
+    df['shin_z'] = devig_shin(odds)[1]
+    fair = df[[f'fair_{method}_{o}' for o in OUTCOMES]].values
+
+    has_close = {'close_H', 'close_D', 'close_A'} <= set(df.columns)
+    if has_close:
+        close = df[['close_H', 'close_D', 'close_A']].values
+        ok = np.isfinite(close).all(axis=1)
+        close_fair = np.full_like(close, np.nan)
+        close_fair[ok] = devig(close[ok], method)
+        clv = odds * close_fair - 1.0           # opening price vs fair closing prob
+        for j, o in enumerate(OUTCOMES):
+            df[f'clv_{o}'] = clv[:, j]
+
+    if model_probs is not None:
+        model = df[[f'prob_{o}' for o in OUTCOMES]].values
+        edge = model - fair
+        ev   = model * odds - 1.0
+        for j, o in enumerate(OUTCOMES):
+            df[f'edge_{o}'] = edge[:, j]
+            df[f'ev_{o}']   = ev[:, j]
+        best = np.nanargmax(np.where(np.isfinite(ev), ev, -np.inf), axis=1)
+        rows = np.arange(len(df))
+        df['bet_outcome'] = np.array(OUTCOMES)[best]
+        df['bet_ev']      = ev[rows, best]
+        df['bet_edge']    = edge[rows, best]
+        df['value_bet']   = df['bet_ev'] > MIN_EV
+        if has_close:
+            df['bet_clv'] = clv[rows, best]
+        if 'actual_result' in df.columns:
+            won = df['actual_result'].values == df['bet_outcome'].values
+            df['bet_return'] = np.where(df['value_bet'],
+                                        np.where(won, odds[rows, best] - 1.0, -1.0), 0.0)
+    return df
+
+
+def segment(res, by='bookmaker'):
+    """Per-segment summary: margin, Shin z, model edge, CLV and flat-stake ROI."""
+    agg = {'overround': 'mean', 'shin_z': 'mean', 'match_id': 'count'}
+    for col in ['bet_edge', 'bet_ev', 'bet_clv']:
+        if col in res.columns:
+            agg[col] = 'mean'
+    out = res.groupby(by).agg(agg).rename(columns={'match_id': 'rows'})
+    if 'bet_return' in res.columns:
+        bets = res[res['value_bet']]
+        g = bets.groupby(by)['bet_return']
+        out['value_bets'] = g.count()
+        out['roi']        = g.sum() / g.count()
+        if 'bet_clv' in res.columns:
+            out['value_bet_clv'] = bets.groupby(by)['bet_clv'].mean()
+    return out.sort_values('overround')
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Market de-vig + edge analytics')
+    ap.add_argument('--odds-glob', default=ODDS_GLOB)
+    ap.add_argument('--model', default=None,
+                    help='CSV with prob_H/D/A (or Blend_*) + match_id or date/home/away')
+    ap.add_argument('--method', default='shin', choices=METHODS)
+    args = ap.parse_args()
+
+    files = sorted(glob.glob(args.odds_glob))
+    if not files:
+        raise FileNotFoundError(f"No odds files found: {args.odds_glob}")
+    raw = pd.concat([pd.read_csv(f).assign(Season=os.path.basename(f)[3:-4]) for f in files],
+                    ignore_index=True)
+    odds_long = football_data_to_long(raw)
+    model = pd.read_csv(args.model) if args.model else None
+
+    t0 = time.perf_counter()
+    res = analyse_market(odds_long, model, args.method)
+    print(f"{len(raw)} matches x {odds_long['bookmaker'].nunique()} books = "
+          f"{len(res):,} rows analysed in {time.perf_counter() - t0:.2f}s")
+    print("\nBy bookmaker:")
+    print(segment(res, 'bookmaker').to_string(float_format='%.4f'))
+    if 'season' in res.columns:
+        print("\nBy season:")
+        print(segment(res, 'season').to_string(float_format='%.4f'))
@@ -0,0 +1,67 @@
+"""
+scripts/percentile_bootstrap.py
+Vectorised bootstrap intervals for radar percentiles.
+
+A player just over the minutes threshold has a handful of gameweek rows, so a
+single "82nd percentile" hides a wide range. Each player's gameweek rows are
+resampled with replacement N_BOOT times; season totals are rebuilt from
+resample counts (one batched einsum for the whole pool -- no per-player loop)
+and every replicate is re-ranked against the fixed peer pool with
+searchsorted, using the same 'rank' convention as percentileofscore /
+pandas rank(pct=True).
+
+Used by everton_squad_radar.py and player_radar_profile.py.
+"""
+import numpy as np
+import pandas as pd
+
+N_BOOT = 1000
+CI     = (5, 95)      # 90% interval
+SEED   = 42
+CHUNK  = 256          # players per batch (bounds memory at CHUNK x N_BOOT x GWs)
+
+
+def resample_totals(rows, id_col, sum_cols, n_boot=N_BOOT, seed=SEED):
+    """Bootstrap season totals by resampling each player's gameweek rows.
+
+    rows -- one row per player appearance (id_col + sum_cols)
+    Returns (ids, totals) where totals[col] is an (n_players, n_boot) array.
+    """
+    rows = rows.sort_values(id_col)
+    codes, ids = pd.factorize(rows[id_col], sort=True)
+    n_rows = np.bincount(codes)
+    pos    = rows.groupby(id_col).cumcount().values
+    P, G, C = len(ids), int(n_rows.max()), len(sum_cols)
+
+    vals = np.zeros((P, G, C))
+    vals[codes, pos] = rows[sum_cols].to_numpy(dtype=float)
+
+    rng = np.random.default_rng(seed)
+    out = np.empty((P, n_boot, C))
+    for start in range(0, P, CHUNK):
+        n  = n_rows[start:start + CHUNK]
+        p  = len(n)
+        draws = (rng.random((p, n_boot, G)) * n[:, None, None]).astype(np.intp)
+        valid = (np.arange(G)[None, None, :] < n[:, None, None])       # first n_p draws count
+        flat  = (np.arange(p * n_boot)[:, None] * G + draws.reshape(p * n_boot, G))
+        counts = np.bincount(flat.ravel(), weights=np.broadcast_to(valid, draws.shape).ravel(),
+                             minlength=p * n_boot * G).reshape(p, n_boot, G)
+        out[start:start + p] = np.einsum('pbg,pgc->pbc', counts, vals[start:start + p])
+    return np.asarray(ids), {c: out[:, :, j] for j, c in enumerate(sum_cols)}
+
+
+def rank_percentiles(values, peer_values):
+    """percentileofscore(kind='rank') of every element of values vs the peer pool."""
+    peers = np.sort(np.asarray(peer_values, dtype=float))
+    peers = peers[~np.isnan(peers)]
+    values = np.asarray(values, dtype=float)
+    left  = np.searchsorted(peers, values, side='left')
+    right = np.searchsorted(peers, values, side='right')
+    pct   = (left + right + (right > left)) * 50.0 / len(peers)
+    return np.where(np.isnan(values), np.nan, pct)
+
+
+def percentile_interval(boot_pcts, ci=CI):
+    """(n_players, n_boot) bootstrap percentiles -> (lo, hi) arrays."""
+    lo, hi = np.nanpercentile(boot_pcts, ci, axis=-1)
+    return lo, hi
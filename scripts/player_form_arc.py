@@ -14,7 +14,7 @@ import matplotlib.ticker as mticker
 from matplotlib.gridspec import GridSpec
 warnings.filterwarnings('ignore')
 
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))   # repo root: assets/ is committed there
 os.makedirs('assets', exist_ok=True)
 
 EVT_BLUE = '#003399'
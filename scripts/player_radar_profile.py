@@ -3,6 +3,7 @@ scripts/player_radar_profile.py
 Generates a professional player profile radar for James Garner (Everton)
 ranking him percentile vs PL midfielders with >=900 min, GW1-26 2025/26.
 Output: assets/garner_performance_radar.png
+        assets/garner_radar_percentile_intervals.csv  (bootstrap intervals, full pool)
 """
 import os, warnings
 import numpy as np
@@ -11,9 +12,10 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyArrowPatch
 import glob
+from percentile_bootstrap import resample_totals, rank_percentiles, percentile_interval, N_BOOT, CI
 warnings.filterwarnings('ignore')
 
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))   # repo root: assets/ is committed there
 os.makedirs('assets', exist_ok=True)
 
 EVT_BLUE   = '#003399'
@@ -26,6 +28,8 @@ DARK_GREY  = '#333333'
 
 plt.rcParams.update({'font.family': 'sans-serif'})
 
+BOOTSTRAP_BANDS = True   # shade the bootstrap percentile interval on the radar
+
 GW_DIR = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model\FPL_RAW_DATA\main_2025'
 
 # ── 1. Load all GWs and aggregate per player ──────────────────────────────────
@@ -91,9 +95,32 @@ if garner.empty:
 g = garner.iloc[0]
 garner_pcts = [g[f'{m}_pct'] for m in metrics]
 
+# ── 2b. Bootstrap percentile intervals (whole pool, one batched pass) ─────────
+# Resample each pool player's GW appearances N_BOOT times, rebuild per-90
+# values from the resampled totals and re-rank against the fixed pool.
+TOTAL_COLS = {'xgi_p90': 'expected_goal_involvements', 'creativity_p90': 'creativity',
+              'tackles_p90': 'tackles', 'recoveries_p90': 'recoveries',
+              'def_contrib_p90': 'defensive_contribution', 'influence_p90': 'influence'}
+apps = field[(field['minutes'] > 0) & field['id'].isin(pool['id'])]
+boot_ids, boot_tot = resample_totals(apps, 'id', ['minutes'] + list(TOTAL_COLS.values()),
+                                     n_boot=N_BOOT)
+rows     = pd.Series(np.arange(len(boot_ids)), index=boot_ids).reindex(pool['id']).values.astype(int)
+boot_min = np.clip(boot_tot['minutes'][rows], 1, None)
+for m in metrics:
+    boot_pct = rank_percentiles(boot_tot[TOTAL_COLS[m]][rows] / boot_min * 90, pool[m].values)
+    pool[f'{m}_pct_lo'], pool[f'{m}_pct_hi'] = percentile_interval(boot_pct)
+
+pool[['id', 'web_name', 'total_minutes'] +
+     [f'{m}{sfx}' for m in metrics for sfx in ('_pct', '_pct_lo', '_pct_hi')]
+     ].to_csv('assets/garner_radar_percentile_intervals.csv', index=False)
+g = pool[pool['second_name'] == 'Garner'].iloc[0]
+garner_lo = [g[f'{m}_pct_lo'] for m in metrics]
+garner_hi = [g[f'{m}_pct_hi'] for m in metrics]
+
 print(f"\nJames Garner — {g['total_minutes']:.0f} minutes | {g['appearances']} appearances")
 for lbl, pct, val, m in zip(labels, garner_pcts, [g[m] for m in metrics], metrics):
-    print(f"  {lbl.replace(chr(10),' '):40s}: {val:.3f}  → {pct:.1f}th percentile")
+    print(f"  {lbl.replace(chr(10),' '):40s}: {val:.3f}  → {pct:.1f}th percentile  "
+          f"({CI[1] - CI[0]}% CI {g[f'{m}_pct_lo']:.0f}–{g[f'{m}_pct_hi']:.0f})")
 
 # ── 3. Build the radar chart ─────────────────────────────────────────────────
 N = len(metrics)
@@ -132,6 +159,11 @@ ax_radar.fill(angles_plot, avg_vals, alpha=0.12, color=TEAL, zorder=2)
 ax_radar.plot(angles_plot, avg_vals, color=TEAL, linewidth=1.2,
               linestyle='--', alpha=0.6, zorder=2, label='Avg PL Midfielder (50th pct)')
 
+# Bootstrap interval band
+if BOOTSTRAP_BANDS:
+    ax_radar.fill_between(angles_plot, garner_lo + [garner_lo[0]], garner_hi + [garner_hi[0]],
+                          color=EVT_BLUE, alpha=0.12, lw=0, zorder=2)
+
 # Garner polygon
 ax_radar.fill(angles_plot, garner_vals, alpha=0.35, color=EVT_BLUE, zorder=3)
 ax_radar.plot(angles_plot, garner_vals, color=EVT_BLUE, linewidth=2.5, zorder=4)
@@ -223,6 +255,8 @@ y -= 0.09
 # Methodology note
 note = (f'Pool: {len(pool)} PL midfielders with >=900 min.\n'
         'Metrics computed per 90. Source: FPL 2025/26 GW data.')
+if BOOTSTRAP_BANDS:
+    note += f'\nShaded band: {CI[1] - CI[0]}% bootstrap interval ({N_BOOT} GW resamples).'
 ax_ctx.text(0.0, y, note, fontsize=7.5, color='#888888',
             va='top', transform=ax_ctx.transAxes, style='italic')
 
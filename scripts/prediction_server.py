@@ -0,0 +1,376 @@
+"""
+scripts/prediction_server.py
+Local low-latency prediction service for the Dynamic Blend
+(Dixon-Coles + LightGBM + dynamic draw multiplier).
+
+Keeps the latest published fit in memory and answers:
+  POST /predict          -- one fixture   {"home_team": ..., "away_team": ..., <REQUEST_FEATURES>}
+  POST /predict/batch    -- a gameweek    {"fixtures": [ {...}, {...} ]}
+  GET  /health           -- loaded model version + cache stats
+
+Published fits live in MODEL_DIR/<version>/ (params.json + lgbm_model.txt) and
+are never overwritten -- each publish needs a new version name.
+MODEL_DIR/LATEST names the live version; it is swapped with os.replace so a
+reader never sees a half-written fit. The server re-checks LATEST at most
+once per RELOAD_INTERVAL seconds and swaps the in-memory state in one
+assignment -- requests in flight finish on the state they started with.
+
+Team parameters (team_parameters.TeamParameters) are stored integer-indexed
+(team -> row in attack / defence / elo arrays) so a whole batch is priced with
+array lookups, one score-matrix broadcast and a single booster.predict call.
+
+Usage:
+  python scripts/prediction_server.py --model-dir <dir> --port 8765
+"""
+import os, json, time, shutil, hashlib, tempfile, threading, argparse
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import lightgbm as lgb
+from team_parameters import TeamParameters
+
+BASE      = r'c:\Users\bigke\OneDrive\Desktop\VS Code Model'
+MODEL_DIR = os.path.join(BASE, 'models', 'live')
+
+PARAMS_FILE  = 'params.json'
+BOOSTER_FILE = 'lgbm_model.txt'
+LATEST_FILE  = 'LATEST'
+
+MAX_GOALS       = 10      # score matrix covers 0..MAX_GOALS per side
+CACHE_SIZE      = 50_000  # LRU entries (fixture + feature hash)
+RELOAD_INTERVAL = 1.0     # seconds between LATEST checks
+
+# Same feature set (and scale) as the forward-validation notebook; class order H, D, A.
+# dc_* columns are multiplicative strengths (exp of the log-deviations, ~1 = average).
+# xg_diff is the feature table's home_xg - away_xg, not the DC λ gap, so it has to
+# come with the request along with form and rest days.
+FEATURE_COLS = ['elo_diff', 'xg_diff', 'dc_home_attack', 'dc_away_defence',
+                'form_home_5', 'form_away_5', 'rest_days_home', 'rest_days_away']
+REQUEST_FEATURES = ['xg_diff', 'form_home_5', 'form_away_5', 'rest_days_home', 'rest_days_away']
+
+
+# ── Dixon-Coles score matrix ──────────────────────────────────────────────────
+_GOALS     = np.arange(MAX_GOALS + 1)
+_LOG_FACT  = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1)))])
+_HOME_MASK = _GOALS[:, None] > _GOALS[None, :]
+_DRAW_MASK = np.eye(MAX_GOALS + 1, dtype=bool)
+_AWAY_MASK = _GOALS[:, None] < _GOALS[None, :]
+
+
+def poisson_pmf(lam):
+    """(N,) rates -> (N, MAX_GOALS+1) Poisson pmf table."""
+    lam = np.asarray(lam, dtype=float)[:, None]
+    return np.exp(_GOALS * np.log(lam) - lam - _LOG_FACT)
+
+
+def dc_score_matrix(lam_h, lam_a, rho):
+    """(N, G+1, G+1) joint score probabilities with the DC low-score correction."""
+    lam_h = np.asarray(lam_h, dtype=float)
+    lam_a = np.asarray(lam_a, dtype=float)
+    m = poisson_pmf(lam_h)[:, :, None] * poisson_pmf(lam_a)[:, None, :]
+    m[:, 0, 0] *= 1 - lam_h * lam_a * rho
+    m[:, 0, 1] *= 1 + lam_h * rho
+    m[:, 1, 0] *= 1 + lam_a * rho
+    m[:, 1, 1] *= 1 - rho
+    return m / m.sum(axis=(1, 2), keepdims=True)
+
+
+def outcome_probs(score_matrix):
+    """(N, G+1, G+1) score matrix -> (N, 3) H/D/A probabilities."""
+    flat = score_matrix.reshape(len(score_matrix), -1)
+    masks = np.stack([_HOME_MASK.ravel(), _DRAW_MASK.ravel(), _AWAY_MASK.ravel()], axis=1)
+    return flat @ masks.astype(float)
+
+
+# ── Published model state ─────────────────────────────────────────────────────
+class ModelState:
+    """Everything needed to price a fixture, loaded once per published fit."""
+
+    def __init__(self, version, params, booster, blend_weight, draw_boost, draw_scale):
+        self.version      = version
+        self.params       = params
+        self.booster      = booster
+        self.blend_weight = float(blend_weight)
+        self.draw_boost   = float(draw_boost)
+        self.draw_scale   = float(draw_scale)
+
+
+def read_latest(model_dir):
+    """Return the version named in MODEL_DIR/LATEST (or None if nothing published)."""
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_state(model_dir, version):
+    """Load params.json (+ booster if present) for one published version."""
+    fit_dir = os.path.join(model_dir, version)
+    with open(os.path.join(fit_dir, PARAMS_FILE)) as f:
+        d = json.load(f)
+    booster_path = os.path.join(fit_dir, BOOSTER_FILE)
+    booster = lgb.Booster(model_file=booster_path) if os.path.exists(booster_path) else None
+    blend = d.get('blend', {})
+    return ModelState(version, TeamParameters.from_dict(d['team_params']), booster,
+                      blend_weight=blend.get('dc_weight', 1.0 if booster is None else 0.5),
+                      draw_boost=blend.get('draw_boost', 0.0),
+                      draw_scale=blend.get('draw_scale', 0.5))
+
+
+def publish_fit(model_dir, version, team_params, booster=None,
+                dc_weight=0.5, draw_boost=0.0, draw_scale=0.5):
+    """Write a fit to MODEL_DIR/<version>/ and atomically point LATEST at it.
+
+    Versions are immutable: the server and the cache key on the version name,
+    so republishing under an existing name raises FileExistsError. The fit is
+    written to a scratch directory and renamed into place, so a version
+    directory never holds files from an earlier publish.
+    """
+    fit_dir = os.path.join(model_dir, version)
+    if os.path.exists(fit_dir):
+        raise FileExistsError(f"Version {version!r} already published in {model_dir}")
+    os.makedirs(model_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{version}.', dir=model_dir)
+    try:
+        if booster is not None:
+            booster.save_model(os.path.join(tmp_dir, BOOSTER_FILE))
+        payload = {
+            'version':     version,
+            'team_params': team_params.to_dict(),
+            'blend':       {'dc_weight': dc_weight, 'draw_boost': draw_boost,
+                            'draw_scale': draw_scale},
+            'features':    FEATURE_COLS,
+        }
+        with open(os.path.join(tmp_dir, PARAMS_FILE), 'w') as f:
+            json.dump(payload, f)
+        os.rename(tmp_dir, fit_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    tmp = os.path.join(model_dir, LATEST_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(model_dir, LATEST_FILE))
+    return fit_dir
+
+
+# ── LRU cache ─────────────────────────────────────────────────────────────────
+class LRUCache:
+    """Thread-safe LRU keyed by (model version, home, away, feature hash)."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key, val):
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def feature_hash(fixture):
+    """Stable short hash of the fixture's feature inputs (order-independent)."""
+    feats = {k: fixture[k] for k in FEATURE_COLS if k in fixture}
+    blob  = json.dumps(feats, sort_keys=True, default=float).encode()
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+
+# ── Prediction service ────────────────────────────────────────────────────────
+class PredictionService:
+    """In-memory Dynamic Blend with an LRU cache and hot reload of new fits."""
+
+    def __init__(self, model_dir=MODEL_DIR, cache_size=CACHE_SIZE,
+                 reload_interval=RELOAD_INTERVAL):
+        self.model_dir       = model_dir
+        self.reload_interval = reload_interval
+        self.cache           = LRUCache(cache_size)
+        self._reload_lock    = threading.Lock()
+        self._last_check     = 0.0
+        self._state          = None
+        self._bad_version    = None
+        self.maybe_reload(force=True)
+        if self._state is None:
+            raise FileNotFoundError(f"No published fit found in {model_dir} ({LATEST_FILE} missing)")
+
+    @property
+    def state(self):
+        return self._state
+
+    def maybe_reload(self, force=False):
+        """Swap in a newly published fit; cheap no-op between checks.
+
+        A fit that fails to load is logged and skipped until LATEST moves on;
+        the current state keeps serving.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.reload_interval:
+            return False
+        with self._reload_lock:
+            self._last_check = now
+            version = read_latest(self.model_dir)
+            if version is None or (self._state is not None and version == self._state.version):
+                return False
+            if version == self._bad_version:
+                return False                                   # already failed; wait for a new LATEST
+            try:
+                new_state = load_state(self.model_dir, version)   # fully built before swap
+            except Exception as e:
+                if self._state is None:
+                    raise                                      # nothing to fall back on at startup
+                self._bad_version = version
+                print(f"Failed to load fit {version}: {type(e).__name__}: {e} "
+                      f"-- still serving {self._state.version}")
+                return False
+            self._state = new_state
+            print(f"Loaded fit {version}  ({len(new_state.params.teams)} teams, "
+                  f"booster={'yes' if new_state.booster is not None else 'no'})")
+            return True
+
+    def predict(self, fixture):
+        return self.predict_batch([fixture])[0]
+
+    def predict_batch(self, fixtures):
+        """Price a list of fixtures; cache misses are computed in one vectorised pass."""
+        self.maybe_reload()
+        state = self._state
+        keys = [(state.version, f['home_team'], f['away_team'], feature_hash(f)) for f in fixtures]
+        out  = [self.cache.get(k) for k in keys]
+        miss = [i for i, r in enumerate(out) if r is None]
+        if miss:
+            fresh = compute_predictions(state, [fixtures[i] for i in miss])
+            for i, r in zip(miss, fresh):
+                self.cache.put(keys[i], r)
+                out[i] = r
+        return out
+
+
+def build_features(state, fixtures, home_idx, away_idx):
+    """(N, len(FEATURE_COLS)) matrix on the training-table scale.
+
+    elo_diff and the dc_* strengths come from the fit (and can be overridden per
+    fixture); REQUEST_FEATURES missing from a fixture stay NaN.
+    """
+    p = state.params
+    X = np.full((len(fixtures), len(FEATURE_COLS)), np.nan)
+    X[:, 0] = p.elo[home_idx] - p.elo[away_idx]
+    X[:, 2] = np.exp(p.attack[home_idx])
+    X[:, 3] = np.exp(p.defence[away_idx])
+    for i, f in enumerate(fixtures):
+        for j, col in enumerate(FEATURE_COLS):
+            v = f.get(col)
+            if v is not None:
+                X[i, j] = float(v)
+    return X
+
+
+def compute_predictions(state, fixtures):
+    """Vectorised DC + booster + draw multiplier for a list of fixture dicts."""
+    p = state.params
+    home_idx = p.index(f['home_team'] for f in fixtures)
+    away_idx = p.index(f['away_team'] for f in fixtures)
+    lam_h, lam_a = p.expected_goals(home_idx, away_idx)
+
+    p_dc = outcome_probs(dc_score_matrix(lam_h, lam_a, p.rho))
+    if state.booster is not None:
+        X = build_features(state, fixtures, home_idx, away_idx)
+        p_gbm = np.asarray(state.booster.predict(X)).reshape(len(fixtures), 3)
+        blend = state.blend_weight * p_dc + (1 - state.blend_weight) * p_gbm
+    else:
+        blend = p_dc.copy()
+
+    # Dynamic draw multiplier: boost draws when the two λ are close
+    mult = 1 + state.draw_boost * np.exp(-np.abs(lam_h - lam_a) / state.draw_scale)
+    blend[:, 1] *= mult
+    blend /= blend.sum(axis=1, keepdims=True)
+
+    cols = np.column_stack([p_dc, blend, lam_h, lam_a, lam_h + lam_a]).tolist()
+    names = ['prob_H', 'prob_D', 'prob_A', 'Blend_H', 'Blend_D', 'Blend_A',
+             'xG_Home', 'xG_Away', 'Total_Goals_xG']
+    results = []
+    for f, row in zip(fixtures, cols):
+        r = dict(zip(names, row))
+        r['home_team']     = f['home_team']
+        r['away_team']     = f['away_team']
+        r['model_version'] = state.version
+        results.append(r)
+    return results
+
+
+# ── HTTP front end ────────────────────────────────────────────────────────────
+def make_handler(service):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/health':
+                return self._send(404, {'error': 'not found'})
+            self._send(200, {'model_version': service.state.version,
+                             'cache_entries': len(service.cache),
+                             'cache_hits':    service.cache.hits,
+                             'cache_misses':  service.cache.misses})
+
+        def do_POST(self):
+            try:
+                n   = int(self.headers.get('Content-Length', 0))
+                req = json.loads(self.rfile.read(n) or b'{}')
+                if self.path == '/predict':
+                    return self._send(200, service.predict(req))
+                if self.path == '/predict/batch':
+                    fixtures = req['fixtures'] if isinstance(req, dict) else req
+                    return self._send(200, {'predictions': service.predict_batch(fixtures)})
+                self._send(404, {'error': 'not found'})
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {'error': f'{type(e).__name__}: {e}'})
+
+        def log_message(self, *args):   # keep the hot path quiet
+            pass
+
+    return Handler
+
+
+def serve(model_dir=MODEL_DIR, host='127.0.0.1', port=8765):
+    service = PredictionService(model_dir)
+    httpd   = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving fit {service.state.version} on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Dynamic Blend prediction server')
+    ap.add_argument('--model-dir', default=MODEL_DIR)
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    args = ap.parse_args()
+    serve(args.model_dir, args.host, args.port)
@@ -0,0 +1,74 @@
+"""
+scripts/team_parameters.py
+Integer team-indexed rate parameters shared by the goal and corner models.
+
+Teams map to rows of attack / defence arrays (log-deviations from the league
+mean, 0 = average), so a whole batch of fixtures is priced with array lookups:
+
+  log rate_home = mu + home_adv + attack[home] + defence[away]
+  log rate_away = mu +            attack[away] + defence[home]
+
+TeamRates is the bare layout; TeamParameters adds the goal model's Elo ratings
+and Dixon-Coles rho. numpy only, so importing it pulls in no model runtime.
+"""
+import numpy as np
+
+
+class TeamRates:
+    """attack / defence arrays indexed by team id plus the league intercepts."""
+
+    def __init__(self, teams, attack, defence, mu, home_adv):
+        self.teams      = list(teams)
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.attack     = np.asarray(attack, dtype=float)
+        self.defence    = np.asarray(defence, dtype=float)
+        self.mu         = float(mu)
+        self.home_adv   = float(home_adv)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['teams'], d['attack'], d['defence'], d['mu'], d['home_adv'])
+
+    def to_dict(self):
+        return {
+            'teams':    self.teams,
+            'attack':   self.attack.tolist(),
+            'defence':  self.defence.tolist(),
+            'mu':       self.mu,
+            'home_adv': self.home_adv,
+        }
+
+    def index(self, names):
+        """Map team names to integer ids; unknown teams raise ValueError."""
+        try:
+            return np.fromiter((self.team_index[n] for n in names), dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Unknown team {e.args[0]!r} -- not in the fitted parameters")
+
+    def expected_rates(self, home_idx, away_idx):
+        """Vectorised (rate_home, rate_away) for index arrays."""
+        rate_h = np.exp(self.mu + self.home_adv + self.attack[home_idx] + self.defence[away_idx])
+        rate_a = np.exp(self.mu + self.attack[away_idx] + self.defence[home_idx])
+        return rate_h, rate_a
+
+
+class TeamParameters(TeamRates):
+    """Dixon-Coles + Elo goal parameters: λ_home = exp(mu + home_adv + attack[home] + defence[away])."""
+
+    def __init__(self, teams, attack, defence, elo, mu, home_adv, rho):
+        super().__init__(teams, attack, defence, mu, home_adv)
+        self.elo = np.asarray(elo, dtype=float)
+        self.rho = float(rho)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['teams'], d['attack'], d['defence'], d['elo'],
+                   d['mu'], d['home_adv'], d['rho'])
+
+    def to_dict(self):
+        d = super().to_dict()
+        d['elo'] = self.elo.tolist()
+        d['rho'] = self.rho
+        return d
+
+    expected_goals = TeamRates.expected_rates